@@ -7,7 +7,7 @@ current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
 #Import from fixed init
-from init import create_chat_pipeline, YuktiKnowledgeBase
+from init import YuktiSessionManager
 
 #Page configuration
 st.set_page_config(
@@ -16,6 +16,11 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_session_manager():
+    """One manager (connection pool, formatter, knowledge base) for all users"""
+    return YuktiSessionManager()
+
 def main():
     st.title("🤖 YuktiAI")
     st.markdown("*Your standalone AI assistant*")
@@ -31,19 +36,18 @@ def main():
                 with st.spinner("🔄 Initializing YuktiAI..."):
                     
                     try:
-                        #Create chat pipeline
-                        pipeline = create_chat_pipeline()
+                        #Get the shared session manager
+                        manager = get_session_manager()
                         
-                        if pipeline:
+                        if manager:
                             st.success("✅ Chat pipeline created successfully!")
                             
-                            #Initialize the pipeline
-                            init_result = pipeline.initialize_pipeline()
+                            #Initialize the shared pipeline components
+                            init_result = manager.initialize()
                             
                             if init_result["success"]:
                                 st.session_state.yukti_initialized = True
-                                st.session_state.pipeline = pipeline
-                                st.session_state.knowledge_base = YuktiKnowledgeBase()
+                                st.session_state.session_id = manager.create_session()
                                 
                                 st.success("🎉 YuktiAI initialized successfully!")
                                 st.balloons()
@@ -112,12 +116,16 @@ def main():
     #Main chat interface
     if st.session_state.get('yukti_initialized', False):
         
+        manager = get_session_manager()
+        session = manager.get_session(st.session_state.session_id)
+        pipeline = session.pipeline
+        
         #Sidebar
         with st.sidebar:
             st.header("🎛️ YuktiAI Controls")
             
             #Status indicator
-            status = st.session_state.pipeline.get_system_status()
+            status = pipeline.get_system_status()
             
             if status['ollama_running']:
                 st.success("🟢 Ollama: Connected")
@@ -133,8 +141,7 @@ def main():
             
             #Controls
             if st.button("🗑️ Clear Chat", use_container_width=True):
-                st.session_state.chat_history = []
-                st.session_state.pipeline.clear_conversation()
+                manager.clear_session(session.session_id)
                 st.rerun()
             
             if st.button("🔄 Refresh Status", use_container_width=True):
@@ -146,6 +153,14 @@ def main():
             memory_stats = status.get('memory_stats', {})
             st.metric("💭 Conversations", memory_stats.get('total_conversations', 0))
             
+            session_stats = manager.get_stats()
+            st.metric("👥 Active Sessions", session_stats['resident_sessions'])
+            st.metric("🧠 Session Memory", f"{session_stats['session_memory_bytes'] / 1024:.1f} KB")
+            
+            with st.expander("📊 Memory Usage"):
+                if st.button("Measure", use_container_width=True):
+                    st.json(manager.get_memory_report())
+            
             st.markdown("---")
             
             #About
@@ -163,55 +178,60 @@ def main():
                 """)
         
         #Initialize chat history
-        if 'chat_history' not in st.session_state:
-            st.session_state.chat_history = []
+        chat_history = session.chat_history
+        if not chat_history:
             
             #Add welcome message
-            welcome_msg = st.session_state.knowledge_base.get_random_greeting()
-            st.session_state.chat_history.append({
+            welcome_msg = manager.knowledge_base.get_random_greeting()
+            chat_history.append({
                 "role": "assistant", 
                 "content": welcome_msg
             })
         
         #Display chat messages
-        for message in st.session_state.chat_history:
+        for message in chat_history:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
         
         #Chat input
         if prompt := st.chat_input("Ask YuktiAI anything...", key="chat_input"):
             
-            #Add user message
-            st.session_state.chat_history.append({
-                "role": "user", 
-                "content": prompt
-            })
-            
-            with st.chat_message("user"):
-                st.markdown(prompt)
-            
-            #Generate response
-            with st.chat_message("assistant"):
+            #Hold the session so it is not evicted while the answer is generated
+            with manager.use_session(session.session_id) as session:
+                chat_history = session.chat_history
+                pipeline = session.pipeline
                 
-                with st.spinner("🤔 YuktiAI is thinking..."):
-                    try:
-                        response = st.session_state.pipeline.get_response(prompt)
-                        st.markdown(response)
-                        
-                        #Add to history
-                        st.session_state.chat_history.append({
-                            "role": "assistant",
-                            "content": response
-                        })
-                        
-                    except Exception as e:
-                        error_msg = f"❌ Error generating response: {str(e)}"
-                        st.error(error_msg)
-                        
-                        st.session_state.chat_history.append({
-                            "role": "assistant",
-                            "content": error_msg
-                        })
+                #Add user message
+                chat_history.append({
+                    "role": "user", 
+                    "content": prompt
+                })
+                
+                with st.chat_message("user"):
+                    st.markdown(prompt)
+                
+                #Generate response
+                with st.chat_message("assistant"):
+                    
+                    with st.spinner("🤔 YuktiAI is thinking..."):
+                        try:
+                            response = pipeline.get_response(prompt)
+                            st.markdown(response)
+                            
+                            #Add to history
+                            chat_history.append({
+                                "role": "assistant",
+                                "content": response
+                            })
+                            
+                        except Exception as e:
+                            error_msg = f"❌ Error generating response: {str(e)}"
+                            st.error(error_msg)
+                            
+                            chat_history.append({
+                                "role": "assistant",
+                                "content": error_msg
+                            })
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,9 +7,24 @@ Version: 1.0.0
 
 import sys
 import os
+import argparse
+import cProfile
+import io
+import pstats
 from pathlib import Path
 import logging
 import json
+import queue
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 
 # =============================================================================
@@ -89,6 +104,74 @@ class YuktiConfig:
     TEMPERATURE = 0.7
     MEMORY_SIZE = 10
     
+    #Backend Resilience
+    OLLAMA_HOSTS = [OLLAMA_HOST]
+    CONNECT_TIMEOUT = 5
+    REQUEST_TIMEOUT = 60
+    ATTEMPT_READ_TIMEOUT = 20
+    RETRY_MAX_ATTEMPTS = 2
+    RETRY_BASE_DELAY = 0.25
+    RETRY_MAX_DELAY = 2.0
+    RETRY_BUDGET_RATIO = 0.2
+    RETRY_BUDGET_MAX = 10
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_RESET_TIMEOUT = 30
+    
+    #Request Hedging (needs more than one entry in OLLAMA_HOSTS)
+    HEDGE_ENABLED = False
+    HEDGE_PERCENTILE = 95
+    HEDGE_DEFAULT_DELAY = 2.0
+    HEDGE_MIN_DELAY = 0.5
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_MEASURE_RATE = 0.1
+    
+    #Connection Pool and Sessions
+    POOL_MAXSIZE = 32
+    SESSION_TTL = 1800
+    MAX_RESIDENT_SESSIONS = 200
+    SESSION_STORE_DIR = "data/sessions"
+    SESSION_STORE_TTL = 7 * 24 * 3600
+    SESSION_STATS_TTL = 5
+    
+    #Compound Question Fan-out
+    DECOMPOSE_QUERIES = False
+    DECOMPOSE_MAX_PARTS = 4
+    OLLAMA_NUM_PARALLEL = 1
+    
+    #Rolling Conversation Summary
+    SUMMARY_ENABLED = True
+    CONTEXT_TURNS = 2
+    SUMMARY_MAX_CHARS = 1200
+    SUMMARY_MAX_TOKENS = 300
+    SUMMARY_BATCH_TURNS = 4
+    SUMMARY_IDLE_POLL = 0.25
+    
+    #Generation Budgets
+    ADAPTIVE_BUDGETS = True
+    EARLY_STOP_ENABLED = False
+    BUDGET_LOG_FILE = "logs/generation.jsonl"
+    BUDGET_LOG_MAX_BYTES = 5 * 1024 * 1024
+    BUDGET_MIN_SAMPLES = 20
+    BUDGET_PERCENTILE = 95
+    BUDGET_HEADROOM = 1.25
+    BUDGET_MIN_TOKENS = 128
+    BUDGET_TRUNCATION_RATE = 0.05
+    
+    #Request Profiling (disabled by default)
+    PROFILE_SAMPLE_RATE = 0.0
+    PROFILE_SLOW_THRESHOLD = 0.0
+    PROFILE_SAMPLE_INTERVAL = 0.01
+    PROFILE_DIR = "logs/profiles"
+    PROFILE_MAX_BYTES = 50 * 1024 * 1024
+    
+    #Memory Profiling
+    MEMORY_TRACE_ON_START = False
+    MEMORY_TRACE_FRAMES = 1
+    MEMORY_SNAPSHOT_LIMIT = 5
+    MEMORY_DUMP_DIR = "logs/memory"
+    MEMORY_DUMP_INTERVAL = 300
+    MEMORY_DUMP_KEEP = 10
+    
     #System Prompt
     SYSTEM_PROMPT = """You are YuktiAI, an intelligent and helpful AI assistant.
 
@@ -110,11 +193,742 @@ Remember: You are YuktiAI - a standalone AI assistant that provides comprehensiv
             "assistant_name": cls.ASSISTANT_NAME,
             "ollama_host": cls.OLLAMA_HOST,
             "ollama_model": cls.OLLAMA_MODEL,
+            "ollama_hosts": list(cls.OLLAMA_HOSTS),
+            "hedge_enabled": cls.HEDGE_ENABLED,
             "max_response_length": cls.MAX_RESPONSE_LENGTH,
             "temperature": cls.TEMPERATURE,
             "memory_size": cls.MEMORY_SIZE
         }
 
+# =============================================================================
+# EMBEDDED RESILIENCE LAYER
+# =============================================================================
+
+def _percentile(values, percent: float) -> float:
+    """Nearest-rank percentile of a sequence of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+class YuktiCircuitBreaker:
+    """Per-backend circuit breaker"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent to this backend"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            
+            #Half-open: let a single trial request through
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        """Close the circuit after a successful request"""
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+    
+    def record_failure(self):
+        """Count a failure and open the circuit when needed"""
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+    
+    def release(self):
+        """Release a half-open trial that was cancelled without a result"""
+        with self.lock:
+            self.trial_in_flight = False
+
+class YuktiRetryBudget:
+    """Token bucket limiting retries and hedges to a fraction of traffic"""
+    
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.lock = threading.Lock()
+    
+    def deposit(self):
+        """Credit the budget for one original request"""
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+    
+    def withdraw(self) -> bool:
+        """Spend one token for a retry or hedge, if available"""
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+class _YuktiAttempt:
+    """A single streaming generation attempt against one backend"""
+    
+    __slots__ = ('backend', 'started', 'ttft', 'parts', 'tokens', 'stats', 'error',
+                 'response', 'cancelled', 'failed', 'finished', 'shadow', 'request_started', 'should_stop')
+    
+    def __init__(self, backend: str, request_started: float, should_stop=None):
+        self.backend = backend
+        self.should_stop = should_stop
+        self.started = time.monotonic()
+        self.request_started = request_started
+        self.ttft = None
+        self.parts = []
+        self.tokens = 0
+        self.stats = None
+        self.error = None
+        self.response = None
+        self.cancelled = threading.Event()
+        self.failed = False
+        self.finished = None
+        self.shadow = None
+    
+    def cancel(self, failed: bool = False):
+        """Stop reading the stream; closing it makes Ollama abort generation
+        
+        failed marks the backend as at fault (stuck or too slow), so its
+        circuit breaker counts a failure instead of just releasing the trial.
+        """
+        self.failed = self.failed or failed
+        self.cancelled.set()
+        response = self.response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+class YuktiResilientClient:
+    """Ollama client with circuit breakers, retry budget and optional hedging
+    
+    Requests are streamed so the time to first token is observable. When
+    hedging is enabled and the first token has not arrived within the
+    configured percentile of recent first-token delays, a duplicate request is
+    sent to another backend and whichever finishes first wins; the loser is
+    cancelled. A small fraction of losing primaries (HEDGE_MEASURE_RATE) is
+    left to finish so the p99 improvement can be measured, not guessed.
+    
+    An attempt silent for ATTEMPT_READ_TIMEOUT fails early enough to retry
+    elsewhere. Attempts cut off by the deadline, and primaries beaten by a
+    hedge before their first token, count as failures for their backend's
+    circuit, so a stuck or slow backend stops receiving traffic.
+    """
+    
+    def __init__(self, config, session):
+        self.config = config
+        self.session = session
+        self.backends = list(getattr(config, 'OLLAMA_HOSTS', None) or [config.OLLAMA_HOST])
+        self.breakers = {
+            backend: YuktiCircuitBreaker(config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT)
+            for backend in self.backends
+        }
+        self.retry_budget = YuktiRetryBudget(config.RETRY_BUDGET_RATIO, config.RETRY_BUDGET_MAX)
+        self.lock = threading.Lock()
+        self.attempt_lock = threading.Lock()
+        self.next_backend = 0
+        
+        #Rolling windows used for hedge delays and reporting
+        self.ttft_samples = deque(maxlen=500)
+        self.latencies = deque(maxlen=1000)
+        self.counterfactual_latencies = deque(maxlen=1000)
+        self.hedge_savings = deque(maxlen=200)
+        
+        self.counters = {
+            "requests": 0,
+            "failures": 0,
+            "retries": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+            "hedges_measured": 0,
+            "tokens": 0,
+            "extra_tokens": 0
+        }
+        self.logger = logging.getLogger('YuktiResilientClient')
+    
+    def _count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counters[key] += amount
+    
+    def hedge_delay(self) -> float:
+        """Delay after which an unanswered request gets hedged"""
+        with self.lock:
+            samples = list(self.ttft_samples)
+        if len(samples) < self.config.HEDGE_MIN_SAMPLES:
+            return self.config.HEDGE_DEFAULT_DELAY
+        return max(self.config.HEDGE_MIN_DELAY, _percentile(samples, self.config.HEDGE_PERCENTILE))
+    
+    def _pick_backend(self, exclude, advance=False):
+        """Round-robin over backends whose circuit admits a request
+        
+        Only primary launches advance the pointer; hedges and retries start
+        from the next backend in line so primaries keep rotating.
+        """
+        with self.lock:
+            start = self.next_backend
+            if advance:
+                self.next_backend = (self.next_backend + 1) % len(self.backends)
+        
+        for offset in range(len(self.backends)):
+            backend = self.backends[(start + offset) % len(self.backends)]
+            if backend in exclude:
+                continue
+            if self.breakers[backend].allow_request():
+                return backend
+        return None
+    
+    def _launch(self, data, events, exclude, request_started, should_stop=None, advance=False):
+        backend = self._pick_backend(exclude, advance)
+        if backend is None:
+            return None
+        
+        attempt = _YuktiAttempt(backend, request_started, should_stop)
+        worker = threading.Thread(
+            target=self._run_attempt,
+            args=(attempt, data, events),
+            name=f"yukti-attempt-{backend}",
+            daemon=True
+        )
+        worker.start()
+        return attempt
+    
+    def _run_attempt(self, attempt, data, events):
+        try:
+            #A backend silent for this long is stuck; fail the attempt while a retry still fits
+            read_timeout = min(self.config.ATTEMPT_READ_TIMEOUT, self.config.REQUEST_TIMEOUT / 2)
+            response = self.session.post(
+                f"{attempt.backend}/api/generate",
+                json=data,
+                stream=True,
+                timeout=(self.config.CONNECT_TIMEOUT, read_timeout)
+            )
+            attempt.response = response
+            if attempt.cancelled.is_set():
+                response.close()
+                return
+            
+            if response.status_code != 200:
+                raise RuntimeError(f"{attempt.backend} returned HTTP {response.status_code}")
+            
+            for line in response.iter_lines():
+                if attempt.cancelled.is_set():
+                    break
+                if not line:
+                    continue
+                
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                
+                piece = chunk.get("response", "")
+                if piece:
+                    attempt.parts.append(piece)
+                    attempt.tokens += 1
+                    if attempt.ttft is None:
+                        attempt.ttft = time.monotonic() - attempt.started
+                        events.put(("first_token", attempt))
+                    
+                    #Stop decoding once the answer is complete
+                    if attempt.should_stop is not None and ("\n" in piece or attempt.tokens % 4 == 0):
+                        text = "".join(attempt.parts)
+                        cut = attempt.should_stop(text)
+                        if cut is not None:
+                            now = time.monotonic()
+                            attempt.parts = [text[:cut].rstrip()]
+                            attempt.stats = {
+                                "done": True,
+                                "done_reason": "complete",
+                                "eval_count": attempt.tokens,
+                                "eval_duration": int((now - attempt.started - attempt.ttft) * 1e9),
+                                "total_duration": int((now - attempt.started) * 1e9)
+                            }
+                            break
+                
+                if chunk.get("done"):
+                    attempt.stats = chunk
+                    break
+            
+            if attempt.stats is None and not attempt.cancelled.is_set():
+                raise RuntimeError(f"{attempt.backend} closed the stream before completion")
+                
+        except Exception as e:
+            if not attempt.cancelled.is_set():
+                attempt.error = e
+        finally:
+            if attempt.response is not None:
+                attempt.response.close()
+            
+            with self.attempt_lock:
+                attempt.finished = time.monotonic()
+                shadow = attempt.shadow
+                cancelled = attempt.cancelled.is_set()
+                failed = attempt.failed
+            
+            if shadow is not None:
+                self._finish_shadow(attempt)
+            elif cancelled:
+                if failed:
+                    self.breakers[attempt.backend].record_failure()
+                else:
+                    self.breakers[attempt.backend].release()
+                self._count("extra_tokens", attempt.tokens)
+            
+            events.put(("done", attempt))
+    
+    def _finish_shadow(self, attempt):
+        """Record the counterfactual latency of a losing primary left running"""
+        self._count("extra_tokens", attempt.tokens)
+        if attempt.error is not None or attempt.stats is None:
+            self.breakers[attempt.backend].record_failure()
+            with self.lock:
+                self.counterfactual_latencies.append(attempt.finished - attempt.request_started)
+            return
+        
+        self.breakers[attempt.backend].record_success()
+        primary_latency = attempt.finished - attempt.request_started
+        with self.lock:
+            self.hedge_savings.append(primary_latency - attempt.shadow)
+            self.counterfactual_latencies.append(primary_latency)
+            self.counters["hedges_measured"] += 1
+    
+    def _backoff(self, retry: int, deadline: float) -> bool:
+        """Sleep with full-jitter exponential backoff; False if past deadline"""
+        ceiling = min(self.config.RETRY_MAX_DELAY, self.config.RETRY_BASE_DELAY * (2 ** retry))
+        delay = random.uniform(0, ceiling)
+        if time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+    
+    def generate(self, data: dict, should_stop=None) -> dict:
+        """Run a generation request; returns text, final stats and backend
+        
+        should_stop(text) may return an index at which the streamed text is
+        complete; the stream is then cut there and the backend stops decoding.
+        """
+        request_started = time.monotonic()
+        deadline = request_started + self.config.REQUEST_TIMEOUT
+        self._count("requests")
+        self.retry_budget.deposit()
+        
+        data = dict(data, stream=True)
+        events = queue.Queue()
+        hedging = self.config.HEDGE_ENABLED and len(self.backends) > 1
+        hedge_delay = self.hedge_delay() if hedging else None
+        
+        tried = set()
+        active = []
+        retries = 0
+        hedged = False
+        last_error = None
+        
+        primary = self._launch(data, events, tried, request_started, should_stop, advance=True)
+        if primary is None:
+            self._count("failures")
+            raise RuntimeError("No Ollama backend available (all circuits open)")
+        tried.add(primary.backend)
+        active.append(primary)
+        
+        while active:
+            now = time.monotonic()
+            wait = deadline - now
+            hedge_pending = hedging and not hedged and primary.ttft is None
+            if hedge_pending:
+                wait = min(wait, primary.started + hedge_delay - now)
+            
+            try:
+                kind, attempt = events.get(timeout=max(wait, 0))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    for attempt in active:
+                        attempt.cancel(failed=True)
+                    self._count("failures")
+                    raise TimeoutError(f"Generation timed out after {self.config.REQUEST_TIMEOUT}s")
+                
+                #Hedge timer fired before the first token arrived
+                hedged = True
+                if self.retry_budget.withdraw():
+                    hedge = self._launch(data, events, {a.backend for a in active}, request_started, should_stop)
+                    if hedge is not None:
+                        tried.add(hedge.backend)
+                        active.append(hedge)
+                        self._count("hedges_sent")
+                continue
+            
+            if attempt not in active:
+                continue
+            
+            if kind == "first_token":
+                with self.lock:
+                    self.ttft_samples.append(attempt.ttft)
+                continue
+            
+            active.remove(attempt)
+            if attempt.error is None and attempt.stats is not None:
+                self.breakers[attempt.backend].record_success()
+                return self._finish(attempt, primary, active, request_started)
+            
+            self.breakers[attempt.backend].record_failure()
+            last_error = attempt.error
+            self.logger.warning(f"[WARN] Attempt on {attempt.backend} failed: {attempt.error}")
+            
+            if active:
+                continue
+            
+            #Nothing left in flight: retry on another backend if the budget allows
+            if retries < self.config.RETRY_MAX_ATTEMPTS and self.retry_budget.withdraw():
+                if self._backoff(retries, deadline):
+                    retries += 1
+                    retry = self._launch(data, events, tried, request_started, should_stop)
+                    if retry is None:
+                        retry = self._launch(data, events, set(), request_started, should_stop)
+                    if retry is not None:
+                        self._count("retries")
+                        tried.add(retry.backend)
+                        active.append(retry)
+                        primary = retry
+        
+        self._count("failures")
+        raise last_error or RuntimeError("Generation failed")
+    
+    def generate_background(self, data: dict, should_stop=None) -> dict:
+        """Run one attempt for background work
+        
+        No hedging or retries, and nothing is recorded in the TTFT window,
+        latency statistics or retry budget; only circuit breakers see it.
+        """
+        request_started = time.monotonic()
+        deadline = request_started + self.config.REQUEST_TIMEOUT
+        events = queue.Queue()
+        
+        attempt = self._launch(dict(data, stream=True), events, set(), request_started, should_stop)
+        if attempt is None:
+            raise RuntimeError("No Ollama backend available (all circuits open)")
+        
+        kind = None
+        while kind != "done":
+            try:
+                kind, _ = events.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                attempt.cancel(failed=True)
+                raise TimeoutError(f"Generation timed out after {self.config.REQUEST_TIMEOUT}s")
+        
+        if attempt.error is None and attempt.stats is not None:
+            self.breakers[attempt.backend].record_success()
+            return {
+                "text": "".join(attempt.parts),
+                "stats": attempt.stats,
+                "backend": attempt.backend,
+                "latency": attempt.finished - request_started,
+                "hedged": False
+            }
+        
+        self.breakers[attempt.backend].record_failure()
+        raise attempt.error or RuntimeError("Generation failed")
+    
+    def _finish(self, winner, primary, losers, request_started):
+        latency = winner.finished - request_started
+        hedge_won = winner is not primary
+        
+        measured = False
+        for loser in losers:
+            with self.attempt_lock:
+                already_finished = loser.finished is not None
+                if not already_finished:
+                    if hedge_won and loser is primary and random.random() < self.config.HEDGE_MEASURE_RATE:
+                        #Let the primary finish in the background to measure what hedging saved
+                        loser.shadow = latency
+                        measured = True
+                        continue
+                    #A primary beaten before its first token counts as slow
+                    loser.failed = hedge_won and loser is primary and loser.ttft is None
+                    loser.cancelled.set()
+            
+            if already_finished:
+                self.breakers[loser.backend].release()
+                self._count("extra_tokens", loser.tokens)
+            else:
+                loser.cancel()
+        
+        with self.lock:
+            self.counters["tokens"] += winner.tokens
+            if hedge_won:
+                self.counters["hedges_won"] += 1
+            self.latencies.append(latency)
+            if hedge_won and not measured:
+                saving = sum(self.hedge_savings) / len(self.hedge_savings) if self.hedge_savings else 0.0
+                self.counterfactual_latencies.append(latency + max(saving, 0.0))
+            elif not hedge_won:
+                self.counterfactual_latencies.append(latency)
+        
+        return {
+            "text": "".join(winner.parts),
+            "stats": winner.stats,
+            "backend": winner.backend,
+            "latency": latency,
+            "hedged": hedge_won
+        }
+    
+    def get_stats(self) -> dict:
+        """Report hedging cost in extra tokens against the p99 improvement"""
+        with self.lock:
+            counters = dict(self.counters)
+            latencies = list(self.latencies)
+            counterfactual = list(self.counterfactual_latencies)
+        
+        p99 = _percentile(latencies, 99)
+        p99_unhedged = _percentile(counterfactual, 99)
+        total_tokens = counters["tokens"] + counters["extra_tokens"]
+        
+        return {
+            **counters,
+            "extra_token_ratio": counters["extra_tokens"] / total_tokens if total_tokens else 0.0,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "p99_latency_ms": round(p99 * 1000, 1),
+            "p99_unhedged_estimate_ms": round(p99_unhedged * 1000, 1),
+            "p99_improvement_ms": round(max(p99_unhedged - p99, 0.0) * 1000, 1),
+            "retry_budget_tokens": round(self.retry_budget.tokens, 2),
+            "circuits": {backend: breaker.state for backend, breaker in self.breakers.items()}
+        }
+
+# =============================================================================
+# EMBEDDED GENERATION BUDGETS
+# =============================================================================
+
+class YuktiGenerationBudget:
+    """Per-query-type token limits, stop sequences and completion checks
+    
+    Limits start from DEFAULT_LIMITS and are re-learned from the answer
+    lengths recorded in BUDGET_LOG_FILE: the BUDGET_PERCENTILE of observed
+    lengths plus BUDGET_HEADROOM, raised again whenever more than
+    BUDGET_TRUNCATION_RATE of answers hit their limit. MAX_RESPONSE_LENGTH
+    stays the ceiling for every class. Only log entries for the configured
+    model and backends are learned from; the log is rotated once it grows
+    past BUDGET_LOG_MAX_BYTES.
+    """
+    
+    DEFAULT_LIMITS = {
+        "general": 400,
+        "explanation": 700,
+        "list": 600,
+        "comparison": 800,
+        "tutorial": 1000,
+        "code": 1000
+    }
+    
+    #Stop if the model starts echoing the prompt layout or inventing the next turn
+    STOP_SEQUENCES = {
+        "default": ["\nPrevious Q:", "\nPrevious A:", "\nCurrent question:", "\nUser:"],
+        "code": ["\nPrevious Q:", "\nPrevious A:", "\nCurrent question:"]
+    }
+    
+    LIST_ITEM = re.compile(r'^[ \t]*(?:[-*•]|\d+[.)])\s+', re.MULTILINE)
+    
+    def __init__(self, config):
+        self.config = config
+        self.log_path = Path(__file__).parent.absolute() / config.BUDGET_LOG_FILE
+        self.lock = threading.Lock()
+        self.samples = {query_type: deque(maxlen=500) for query_type in self.DEFAULT_LIMITS}
+        self.counters = {query_type: {"requests": 0, "early_stops": 0, "truncated": 0, "decode_seconds": 0.0}
+                         for query_type in self.DEFAULT_LIMITS}
+        self.started = time.monotonic()
+        self.logger = logging.getLogger('YuktiGenerationBudget')
+        self.load_history()
+    
+    @property
+    def rotated_path(self) -> Path:
+        return self.log_path.with_name(self.log_path.name + ".1")
+    
+    def load_history(self):
+        """Seed the answer-length distributions from the request log"""
+        hosts = set(self.config.OLLAMA_HOSTS)
+        lines = deque(maxlen=5000)
+        
+        try:
+            for path in (self.rotated_path, self.log_path):
+                if path.exists():
+                    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                        lines.extend(f)
+        except OSError as e:
+            self.logger.error(f"[ERROR] Failed to load generation history: {e}")
+        
+        skipped = 0
+        for line in lines:
+            #A truncated or malformed line only loses itself
+            try:
+                entry = json.loads(line)
+                if entry.get("model") != self.config.OLLAMA_MODEL or entry.get("host") not in hosts:
+                    continue
+                if entry.get("query_type") in self.samples:
+                    self.samples[entry["query_type"]].append((int(entry["eval_count"]), entry["done_reason"]))
+            except (ValueError, TypeError, KeyError, AttributeError):
+                skipped += 1
+        
+        if skipped:
+            self.logger.warning(f"[WARN] Skipped {skipped} malformed generation log entries")
+    
+    def limit_for(self, query_type: str) -> int:
+        """Token limit (num_predict) for a query type"""
+        ceiling = self.config.MAX_RESPONSE_LENGTH
+        default = min(self.DEFAULT_LIMITS.get(query_type, ceiling), ceiling)
+        
+        with self.lock:
+            samples = list(self.samples.get(query_type, ()))
+        if len(samples) < self.config.BUDGET_MIN_SAMPLES:
+            return default
+        
+        lengths = [count for count, _ in samples]
+        limit = int(_percentile(lengths, self.config.BUDGET_PERCENTILE) * self.config.BUDGET_HEADROOM)
+        
+        #Answers are being cut off: grow past the longest truncated one
+        truncated = [count for count, reason in samples if reason == "length"]
+        if len(truncated) > self.config.BUDGET_TRUNCATION_RATE * len(samples):
+            limit = max(limit, int(max(truncated) * 1.5))
+        
+        return max(self.config.BUDGET_MIN_TOKENS, min(limit, ceiling))
+    
+    def options_for(self, query_type: str) -> dict:
+        """Ollama options for a query type"""
+        return {
+            "num_predict": self.limit_for(query_type),
+            "stop": list(self.STOP_SEQUENCES.get(query_type, self.STOP_SEQUENCES["default"]))
+        }
+    
+    def find_completion(self, query_type: str, text: str):
+        """Index where the structure a question asked for is complete, or None
+        
+        A code answer is complete after a closed code block and a list or
+        tutorial answer at the end of its list, once the paragraph that
+        follows is finished, is prose and does not introduce more with a
+        trailing colon. The text after that point is dropped. Other query
+        types have no structure to anchor on and are never cut.
+        """
+        fences = text.count("```")
+        if fences % 2:
+            return None
+        
+        if query_type == "code":
+            if not fences:
+                return None
+            end = text.find("\n", text.rfind("```"))
+        elif query_type in ("list", "tutorial"):
+            items = list(self.LIST_ITEM.finditer(text))
+            if len(items) < 2:
+                return None
+            end = text.find("\n\n", items[-1].start())
+        else:
+            return None
+        
+        if end == -1:
+            return None
+        
+        #Wait for the whole next paragraph: more code, steps or a lead-in mean the answer goes on
+        tail = text[end:].lstrip("\n")
+        paragraph_end = tail.find("\n\n")
+        if paragraph_end == -1:
+            return None
+        paragraph = tail[:paragraph_end]
+        if (paragraph.startswith(("    ", "\t"))
+                or paragraph.lstrip().startswith("```")
+                or self.LIST_ITEM.match(paragraph)
+                or paragraph.rstrip().endswith(":")):
+            return None
+        return end
+    
+    def completion_check(self, query_type: str):
+        """should_stop callback for YuktiResilientClient.generate"""
+        if not self.config.EARLY_STOP_ENABLED:
+            return None
+        return lambda text: self.find_completion(query_type, text)
+    
+    def record(self, query_type: str, num_predict: int, stats: dict, backend: str = None):
+        """Record an answer's length and decode time in memory and in the log"""
+        if query_type not in self.samples or not stats:
+            return
+        
+        eval_count = stats.get("eval_count", 0)
+        done_reason = stats.get("done_reason", "stop")
+        decode_seconds = stats.get("eval_duration", 0) / 1e9
+        
+        with self.lock:
+            self.samples[query_type].append((eval_count, done_reason))
+            counters = self.counters[query_type]
+            counters["requests"] += 1
+            counters["decode_seconds"] += decode_seconds
+            if done_reason == "complete":
+                counters["early_stops"] += 1
+            elif done_reason == "length":
+                counters["truncated"] += 1
+            
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                if self.log_path.exists() and self.log_path.stat().st_size >= self.config.BUDGET_LOG_MAX_BYTES:
+                    self.log_path.replace(self.rotated_path)
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({
+                        "timestamp": datetime.now().isoformat(),
+                        "model": self.config.OLLAMA_MODEL,
+                        "host": backend,
+                        "query_type": query_type,
+                        "num_predict": num_predict,
+                        "eval_count": eval_count,
+                        "done_reason": done_reason,
+                        "decode_s": round(decode_seconds, 4)
+                    }) + "\n")
+            except OSError as e:
+                self.logger.error(f"[ERROR] Failed to write generation log: {e}")
+    
+    def get_stats(self, slots: int = 1) -> dict:
+        """Per-class limits, mean decode time and overall slot occupancy"""
+        with self.lock:
+            counters = {query_type: dict(values) for query_type, values in self.counters.items()}
+        
+        classes = {}
+        total_decode = 0.0
+        for query_type, values in counters.items():
+            requests = values["requests"]
+            total_decode += values["decode_seconds"]
+            classes[query_type] = {
+                "limit": self.limit_for(query_type),
+                "requests": requests,
+                "mean_decode_s": round(values["decode_seconds"] / requests, 3) if requests else 0.0,
+                "early_stops": values["early_stops"],
+                "truncated": values["truncated"]
+            }
+        
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "classes": classes,
+            "slot_occupancy": round(total_decode / (elapsed * max(slots, 1)), 4)
+        }
+
 # =============================================================================
 # EMBEDDED OLLAMA HANDLER
 # =============================================================================
@@ -126,74 +940,192 @@ class YuktiOllamaHandler:
         self.config = config
         self.base_url = config.OLLAMA_HOST
         self.model = config.OLLAMA_MODEL
+        self.local = threading.local()
+        self.executor = None
+        self.executor_lock = threading.Lock()
+        self.budget = YuktiGenerationBudget(config)
+        self.active_requests = 0
+        self.active_lock = threading.Lock()
+        self.logger = logging.getLogger('YuktiOllamaHandler')
         
         #Import requests here to avoid dependency issues
         try:
             import requests
             self.requests = requests
             self.session = requests.Session()
+            
+            #One tuned pool per backend, sized for concurrent sessions
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=max(len(config.OLLAMA_HOSTS), 1),
+                pool_maxsize=config.POOL_MAXSIZE
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self.client = YuktiResilientClient(config, self.session)
         except ImportError:
             self.requests = None
             self.session = None
+            self.client = None
             print("[ERROR] requests module not available")
     
-    def check_ollama_status(self) -> bool:
-        """Check if Ollama is running"""
-        if not self.requests:
-            return False
-            
+    def _list_models(self, backend: str):
+        """Model names served by a backend, or None if it is unreachable"""
         try:
-            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self.session.get(f"{backend}/api/tags", timeout=5)
+            if response.status_code == 200:
+                models = response.json().get("models", [])
+                return [model["name"] for model in models]
+            return None
         except Exception:
+            return None
+    
+    def check_ollama_status(self) -> bool:
+        """Check if Ollama is running on at least one backend"""
+        if not self.requests:
             return False
+        
+        reachable = False
+        for backend in self.config.OLLAMA_HOSTS:
+            if self._list_models(backend) is None:
+                self.logger.warning(f"[WARN] Ollama backend not reachable: {backend}")
+            else:
+                reachable = True
+        return reachable
     
     def check_model_availability(self) -> bool:
-        """Check if model is available"""
+        """Check if model is available on every reachable backend"""
         if not self.requests:
             return False
-            
-        try:
-            response = self.session.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                available_models = [model["name"] for model in models]
-                return self.model in available_models
-            return False
-        except Exception:
-            return False
+        
+        available = False
+        for backend in self.config.OLLAMA_HOSTS:
+            models = self._list_models(backend)
+            if models is None:
+                continue
+            if self.model not in models:
+                self.logger.warning(f"[WARN] Model {self.model} not found on {backend}")
+                return False
+            available = True
+        return available
     
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: str, options: dict = None, query_type: str = None) -> str:
         """Generate response using Ollama"""
         if not self.requests:
             return "Error: requests module not available"
-            
+        
+        with self.active_lock:
+            self.active_requests += 1
         try:
+            #Size the budget and stop conditions to the kind of question
+            should_stop = None
+            if query_type and self.config.ADAPTIVE_BUDGETS:
+                options = {**self.budget.options_for(query_type), **(options or {})}
+                should_stop = self.budget.completion_check(query_type)
+            
             data = {
                 "model": self.model,
                 "prompt": prompt,
                 "system": self.config.SYSTEM_PROMPT,
-                "stream": False,
+                "stream": True,
                 "options": {
                     "temperature": self.config.TEMPERATURE,
-                    "num_predict": self.config.MAX_RESPONSE_LENGTH
+                    "num_predict": self.config.MAX_RESPONSE_LENGTH,
+                    **(options or {})
                 }
             }
             
-            response = self.session.post(
-                f"{self.base_url}/api/generate",
-                json=data,
-                timeout=60
-            )
+            self.local.last_result = None
+            result = self.client.generate(data, should_stop)
+            self.local.last_result = result
             
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "").strip()
-            else:
-                return "Sorry, I encountered an error while generating the response."
+            if query_type and self.config.ADAPTIVE_BUDGETS:
+                self.budget.record(query_type, data["options"]["num_predict"], result["stats"], result["backend"])
+            
+            return result["text"].strip()
                 
         except Exception as e:
+            self.local.last_result = {"error": str(e)}
             return f"Sorry, I encountered an error: {str(e)}"
+        finally:
+            with self.active_lock:
+                self.active_requests -= 1
+    
+    def generate_background(self, prompt: str, options: dict = None, should_stop=None) -> str:
+        """Generate a response for background work, kept out of resilience stats"""
+        if not self.requests:
+            return ""
+        
+        try:
+            data = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": self.config.TEMPERATURE,
+                    "num_predict": self.config.MAX_RESPONSE_LENGTH,
+                    **(options or {})
+                }
+            }
+            
+            self.local.last_result = None
+            result = self.client.generate_background(data, should_stop)
+            self.local.last_result = result
+            return result["text"].strip()
+        
+        except Exception as e:
+            self.local.last_result = {"error": str(e)}
+            return ""
+    
+    def slot_count(self) -> int:
+        """Number of generations the backends can decode at once"""
+        return max(1, len(self.config.OLLAMA_HOSTS) * self.config.OLLAMA_NUM_PARALLEL)
+    
+    def has_idle_slot(self) -> bool:
+        """Check whether a decode slot is free of user requests"""
+        return self.active_requests < self.slot_count()
+    
+    def generate_many(self, prompts, query_types=None) -> list:
+        """Generate several responses concurrently across backend slots"""
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.slot_count(),
+                    thread_name_prefix="yukti-fanout"
+                )
+        
+        def generate(prompt, query_type):
+            text = self.generate_response(prompt, query_type=query_type)
+            return text, self.get_last_generation()
+        
+        query_types = query_types or [None] * len(prompts)
+        outputs = list(self.executor.map(generate, prompts, query_types))
+        
+        #Report the parts to the calling thread as one generation
+        results = [result for _, result in outputs if result is not None]
+        errors = [result["error"] for result in results if "error" in result]
+        if errors:
+            self.local.last_result = {"error": "; ".join(errors), "parts": results}
+        else:
+            self.local.last_result = {
+                "stats": {"total_duration": max((r["stats"].get("total_duration", 0) for r in results), default=0)},
+                "backend": ", ".join(sorted({r["backend"] for r in results})),
+                "parts": results
+            }
+        return [text for text, _ in outputs]
+    
+    def get_last_generation(self):
+        """Get the raw result of this thread's last generation call"""
+        return getattr(self.local, 'last_result', None)
+    
+    def get_budget_stats(self) -> dict:
+        """Get per-query-type generation budgets and decode statistics"""
+        return self.budget.get_stats(self.slot_count())
+    
+    def get_resilience_stats(self) -> dict:
+        """Get circuit breaker, retry and hedging statistics"""
+        if not self.client:
+            return {}
+        return self.client.get_stats()
 
 # =============================================================================
 # EMBEDDED MEMORY HANDLER
@@ -202,10 +1134,17 @@ class YuktiOllamaHandler:
 class YuktiMemoryHandler:
     """Embedded memory handler"""
     
+    __slots__ = ('config', 'max_memory', 'conversations', 'summary', 'pending', 'lock', '__weakref__')
+    
     def __init__(self, config):
         self.config = config
         self.max_memory = config.MEMORY_SIZE
         self.conversations = []
+        
+        #Running summary of turns older than the recent context window
+        self.summary = ""
+        self.pending = []
+        self.lock = threading.Lock()
     
     def add_conversation(self, user_input: str, ai_response: str):
         """Add conversation to memory"""
@@ -215,19 +1154,79 @@ class YuktiMemoryHandler:
             "assistant": ai_response
         }
         
-        self.conversations.append(conversation)
+        with self.lock:
+            self.conversations.append(conversation)
+            
+            #A turn leaving the recent context window goes to the summarizer
+            window = self.config.CONTEXT_TURNS
+            if self.config.SUMMARY_ENABLED and len(self.conversations) > window:
+                self.pending.append(self.conversations[-window - 1])
+                
+                #Starved summarizer: fold the oldest turns in without the model so
+                #every turn stays in either the summary or the prompt
+                limit = max(self.config.SUMMARY_BATCH_TURNS, self.max_memory - window)
+                if len(self.pending) > limit:
+                    overflow = self.pending[:len(self.pending) - limit]
+                    self.summary = self._clip(self.extractive_summary(self.summary, overflow))
+                    del self.pending[:len(overflow)]
+            
+            if len(self.conversations) > self.max_memory:
+                self.conversations = self.conversations[-self.max_memory:]
+    
+    def has_pending(self) -> bool:
+        """Check whether a full batch of older turns is waiting to be summarized"""
+        return len(self.pending) >= self.config.SUMMARY_BATCH_TURNS
+    
+    def peek_pending(self):
+        """Get the current summary and the turns waiting to be folded into it"""
+        with self.lock:
+            return self.summary, list(self.pending)
+    
+    def set_summary(self, summary: str, folded=(), base: str = None):
+        """Store the updated running summary, dropping the turns it now covers
         
-        if len(self.conversations) > self.max_memory:
-            self.conversations = self.conversations[-self.max_memory:]
+        base is the summary the new one was built from; anything folded in
+        extractively since then is kept.
+        """
+        with self.lock:
+            if base is not None and self.summary != base and self.summary.startswith(base):
+                summary = f"{summary} {self.summary[len(base):].strip()}"
+            self.summary = self._clip(summary)
+            
+            folded_ids = {id(turn) for turn in folded}
+            self.pending = [turn for turn in self.pending if id(turn) not in folded_ids]
+    
+    def _clip(self, summary: str) -> str:
+        """Keep the most recent part of a summary over SUMMARY_MAX_CHARS"""
+        max_chars = self.config.SUMMARY_MAX_CHARS
+        if len(summary) > max_chars:
+            return "..." + summary[-(max_chars - 3):]
+        return summary
+    
+    @staticmethod
+    def extractive_summary(summary: str, turns) -> str:
+        """Fold turns into a summary without the model, keeping the user's questions"""
+        topics = "; ".join(turn["user"][:80] for turn in turns)
+        marker = "Earlier the user asked: "
+        
+        #Extend a trailing list of questions instead of starting another
+        if summary.endswith(".") and summary.rfind(marker) > summary.rfind(".", 0, len(summary) - 1):
+            return f"{summary[:-1]}; {topics}."
+        return f"{summary} {marker}{topics}.".strip()
     
     def get_recent_context(self, num_recent: int = 3) -> str:
         """Get recent conversation context"""
         if not self.conversations:
             return ""
         
-        recent_conversations = self.conversations[-num_recent:]
+        #Turns waiting for the summarizer are still sent verbatim
+        recent_conversations = self.conversations[-(num_recent + len(self.pending)):]
         context_parts = []
         
+        #Summary stands in for turns older than the recent window
+        if self.summary:
+            context_parts.append(f"Conversation summary: {self.summary}")
+        
         for conv in recent_conversations:
             context_parts.append(f"Previous Q: {conv['user']}")
             context_parts.append(f"Previous A: {conv['assistant'][:200]}...")
@@ -236,7 +1235,10 @@ class YuktiMemoryHandler:
     
     def clear_memory(self):
         """Clear conversation memory"""
-        self.conversations.clear()
+        with self.lock:
+            self.conversations.clear()
+            self.pending.clear()
+            self.summary = ""
     
     def get_memory_stats(self):
         """Get memory statistics"""
@@ -244,7 +1246,173 @@ class YuktiMemoryHandler:
         return {
             "total_conversations": total_conversations,
             "max_memory": self.max_memory,
-            "memory_usage_percent": (total_conversations / self.max_memory) * 100 if self.max_memory > 0 else 0
+            "memory_usage_percent": (total_conversations / self.max_memory) * 100 if self.max_memory > 0 else 0,
+            "summary_chars": len(self.summary),
+            "pending_summary_turns": len(self.pending)
+        }
+    
+    def export_state(self) -> dict:
+        """Export memory for durable storage"""
+        with self.lock:
+            return {
+                "conversations": list(self.conversations),
+                "summary": self.summary,
+                "pending": list(self.pending)
+            }
+    
+    def import_state(self, state: dict):
+        """Restore memory from durable storage"""
+        with self.lock:
+            self.conversations = list(state.get("conversations", []))[-self.max_memory:]
+            self.summary = state.get("summary", "")
+            self.pending = list(state.get("pending", []))
+    
+    def estimate_size(self, seen=None) -> int:
+        """Approximate bytes held by this memory handler"""
+        if seen is None:
+            seen = set()
+        return (
+            sys.getsizeof(self)
+            + estimate_object_size(self.conversations, seen)
+            + estimate_object_size(self.pending, seen)
+            + sys.getsizeof(self.summary)
+        )
+
+# =============================================================================
+# EMBEDDED CONVERSATION SUMMARIZER
+# =============================================================================
+
+class YuktiSummarizer:
+    """Compacts turns older than the context window into a running summary
+    
+    Turns are folded in batches of SUMMARY_BATCH_TURNS on a single background
+    thread. It only generates while a decode slot is free of user requests
+    and abandons the generation as soon as a user request arrives, so the
+    summary never queues ahead of a user on the backend. Each handler is
+    queued at most once, by weak reference, so evicted sessions are not kept
+    alive; the memory handler caps its own backlog.
+    """
+    
+    SUMMARY_PROMPT = """Update the running summary of a conversation between a user and YuktiAI.
+Keep the facts, names, decisions and open questions that later turns may refer to.
+Write plain prose under {max_words} words. Reply with the updated summary only.
+
+Current summary:
+{summary}
+
+Older turns to fold in:
+{turns}
+
+Updated summary:"""
+    
+    def __init__(self, config, ollama_handler):
+        self.config = config
+        self.ollama_handler = ollama_handler
+        self.queue = queue.Queue()
+        self.scheduled = set()
+        self.worker = None
+        self.worker_lock = threading.Lock()
+        self.completed = 0
+        self.fallbacks = 0
+        self.preempted = 0
+        self.logger = logging.getLogger('YuktiSummarizer')
+    
+    def schedule(self, memory_handler):
+        """Queue a memory handler whose older turns need summarizing"""
+        with self.worker_lock:
+            if id(memory_handler) in self.scheduled:
+                return
+            self.scheduled.add(id(memory_handler))
+            
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run, name="yukti-summarizer", daemon=True)
+                self.worker.start()
+        self.queue.put((id(memory_handler), weakref.ref(memory_handler)))
+    
+    def _run(self):
+        while True:
+            key, handler_ref = self.queue.get()
+            with self.worker_lock:
+                self.scheduled.discard(key)
+            
+            memory_handler = handler_ref()
+            try:
+                if memory_handler is not None:
+                    self.summarize(memory_handler)
+            except Exception as e:
+                self.logger.error(f"[ERROR] Summarization failed: {e}")
+            finally:
+                self.queue.task_done()
+    
+    def _wait_for_idle_slot(self):
+        while not self.ollama_handler.has_idle_slot():
+            time.sleep(self.config.SUMMARY_IDLE_POLL)
+    
+    def _generate_when_idle(self, prompt: str, attempts: int = 3):
+        """Generate on an idle slot, yielding to user requests; None if preempted"""
+        for _ in range(attempts):
+            self._wait_for_idle_slot()
+            
+            preempted = threading.Event()
+            def yield_to_users(text):
+                if not self.ollama_handler.has_idle_slot():
+                    preempted.set()
+                    return 0
+                return None
+            
+            new_summary = self.ollama_handler.generate_background(
+                prompt,
+                options={"num_predict": self.config.SUMMARY_MAX_TOKENS, "temperature": 0.2},
+                should_stop=yield_to_users
+            )
+            if not preempted.is_set():
+                return new_summary
+            self.preempted += 1
+        return None
+    
+    def summarize(self, memory_handler):
+        """Fold a handler's pending turns into its summary, a batch at a time"""
+        while memory_handler.has_pending():
+            if not self.summarize_batch(memory_handler):
+                return
+    
+    def summarize_batch(self, memory_handler) -> bool:
+        """Fold the oldest SUMMARY_BATCH_TURNS pending turns; False if preempted"""
+        summary, turns = memory_handler.peek_pending()
+        turns = turns[:self.config.SUMMARY_BATCH_TURNS]
+        
+        max_chars = self.config.SUMMARY_MAX_CHARS
+        turn_lines = "\n".join(
+            f"Q: {turn['user'][:300]}\nA: {turn['assistant'][:600]}" for turn in turns
+        )
+        prompt = self.SUMMARY_PROMPT.format(
+            max_words=max_chars // 6,
+            summary=summary or "(none)",
+            turns=turn_lines
+        )
+        
+        new_summary = self._generate_when_idle(prompt)
+        if new_summary is None:
+            #Users kept every slot busy; the turns stay pending and are sent verbatim
+            return False
+        result = self.ollama_handler.get_last_generation()
+        
+        if not result or "error" in result or not new_summary:
+            #Backend unavailable: keep the user's questions so the topics survive
+            new_summary = memory_handler.extractive_summary(summary, turns)
+            self.fallbacks += 1
+        
+        memory_handler.set_summary(new_summary, turns, base=summary)
+        self.completed += 1
+        return True
+    
+    def get_stats(self):
+        """Get summarizer statistics"""
+        return {
+            "queued": self.queue.qsize(),
+            "completed": self.completed,
+            "fallbacks": self.fallbacks,
+            "preempted": self.preempted
         }
 
 # =============================================================================
@@ -254,6 +1422,19 @@ class YuktiMemoryHandler:
 class YuktiResponseFormatter:
     """Embedded response formatter"""
     
+    #Sentence ends, semicolons, new lines and "then"/"also" connectors
+    COMPOUND_SEPARATORS = re.compile(
+        r'([;\n]+|[.?!]+\s+(?:and\s+)?(?:then\s+|also\s+)?|,?\s+and\s+then\s+|,\s*(?:then|also)\s+)',
+        re.IGNORECASE
+    )
+    
+    #Openings of questions and instructions, as opposed to context sentences
+    REQUEST_OPENING = re.compile(
+        r'^(?:please\s+)?(?:what|how|why|when|where|which|who|is|are|can|could|would|should|does|do|'
+        r'explain|describe|compare|list|give|show|write|tell|create|make|generate|provide|define|summari[sz]e)\b',
+        re.IGNORECASE
+    )
+    
     def __init__(self, config):
         self.config = config
         self.assistant_name = config.ASSISTANT_NAME
@@ -275,6 +1456,39 @@ class YuktiResponseFormatter:
         else:
             return "general"
     
+    def split_compound_query(self, user_input: str, max_parts: int = 4) -> list:
+        """Split a multi-part question into independently answerable parts
+        
+        A piece counts as its own part only when it is a question or an
+        instruction and detect_query_type finds a code/tutorial/explanation/
+        list/comparison signal in it; statements such as "I use python" are
+        attached to a neighbouring part as context.
+        """
+        tokens = self.COMPOUND_SEPARATORS.split(user_input)
+        pieces = []
+        for index in range(0, len(tokens), 2):
+            piece = tokens[index].strip(" ,.")
+            separator = tokens[index + 1] if index + 1 < len(tokens) else ""
+            if piece:
+                pieces.append((piece, "?" in separator or tokens[index].rstrip().endswith("?")))
+        
+        parts = []
+        pending = []
+        for piece, asked in pieces:
+            request = asked or self.REQUEST_OPENING.match(piece)
+            standalone = request and len(piece.split()) >= 3 and self.detect_query_type(piece) != "general"
+            if standalone:
+                parts.append(". ".join(pending + [piece]))
+                pending = []
+            elif parts:
+                parts[-1] = f"{parts[-1]}. {piece}"
+            else:
+                pending.append(piece)
+        
+        if len(parts) < 2 or len(parts) > max_parts:
+            return [user_input.strip()]
+        return parts
+    
     def format_response(self, response: str, query_type: str = "general") -> str:
         """Format response based on type"""
         if not response:
@@ -303,6 +1517,15 @@ class YuktiResponseFormatter:
         """Apply final formatting"""
         query_type = self.detect_query_type(user_input)
         return self.format_response(response, query_type)
+    
+    def merge_responses(self, parts) -> str:
+        """Merge (question, response) pairs of a compound question into one answer"""
+        sections = []
+        for index, (question, response) in enumerate(parts, 1):
+            body = self.format_response(response, self.detect_query_type(question))
+            sections.append(f"**{index}. {question[0].upper()}{question[1:]}**\n\n{body}")
+        
+        return "\n\n---\n\n".join(sections)
 
 # =============================================================================
 # EMBEDDED KNOWLEDGE BASE
@@ -354,6 +1577,171 @@ YuktiAI is an intelligent AI assistant that provides answers.
         
         return None
 
+# =============================================================================
+# EMBEDDED REQUEST PROFILER
+# =============================================================================
+
+class YuktiRequestTrace:
+    """Stage timings of one request, plus an optional profile capture"""
+    
+    __slots__ = ('request_id', 'mode', 'started', 'last_mark', 'stages', 'info',
+                 'profile', 'sampler', 'stop_sampling', 'samples')
+    
+    def __init__(self, request_id: str, mode: str = None):
+        self.request_id = request_id
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.last_mark = self.started
+        self.stages = {}
+        self.info = {}
+        self.profile = None
+        self.sampler = None
+        self.stop_sampling = None
+        self.samples = None
+    
+    def mark(self, stage: str):
+        """Attribute the time since the previous mark to a stage"""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last_mark)
+        self.last_mark = now
+    
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+class YuktiRequestProfiler:
+    """Opt-in profiling of get_response
+    
+    A PROFILE_SAMPLE_RATE fraction of requests runs under cProfile. When
+    PROFILE_SLOW_THRESHOLD is set, every other request gets a cheap stack
+    sampler on its thread, and the samples are kept only if the request
+    turns out to be slow. Captures go to PROFILE_DIR with stage timings,
+    oldest files being removed beyond PROFILE_MAX_BYTES.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self.profile_dir = Path(__file__).parent.absolute() / config.PROFILE_DIR
+        self.disk_lock = threading.Lock()
+        self.captured = 0
+        self.logger = logging.getLogger('YuktiRequestProfiler')
+    
+    def begin(self) -> YuktiRequestTrace:
+        """Start tracing a request on the current thread"""
+        request_id = uuid.uuid4().hex[:12]
+        
+        if self.config.PROFILE_SAMPLE_RATE > 0 and random.random() < self.config.PROFILE_SAMPLE_RATE:
+            trace = YuktiRequestTrace(request_id, "cprofile")
+            trace.profile = cProfile.Profile()
+            try:
+                trace.profile.enable()
+            except ValueError:
+                #Another profiler is already active on this thread
+                trace.mode = None
+                trace.profile = None
+            return trace
+        
+        if self.config.PROFILE_SLOW_THRESHOLD > 0:
+            trace = YuktiRequestTrace(request_id, "sampling")
+            trace.samples = {}
+            trace.stop_sampling = threading.Event()
+            trace.sampler = threading.Thread(
+                target=self._sample_stacks,
+                args=(trace, threading.get_ident()),
+                name=f"yukti-sampler-{request_id}",
+                daemon=True
+            )
+            trace.sampler.start()
+            return trace
+        
+        return YuktiRequestTrace(request_id)
+    
+    def _sample_stacks(self, trace, thread_id):
+        interval = self.config.PROFILE_SAMPLE_INTERVAL
+        while not trace.stop_sampling.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            
+            key = ";".join(reversed(stack))
+            trace.samples[key] = trace.samples.get(key, 0) + 1
+    
+    def finish(self, trace: YuktiRequestTrace):
+        """Stop capturing and write the profile if it was sampled or slow"""
+        latency = trace.elapsed()
+        
+        if trace.profile is not None:
+            trace.profile.disable()
+        if trace.sampler is not None:
+            trace.stop_sampling.set()
+            trace.sampler.join()
+        
+        slow = 0 < self.config.PROFILE_SLOW_THRESHOLD <= latency
+        if trace.mode is None or (trace.mode == "sampling" and not slow):
+            return None
+        
+        try:
+            path = self._write(trace, latency, slow)
+        except Exception as e:
+            self.logger.error(f"[ERROR] Failed to write profile for request {trace.request_id}: {e}")
+            return None
+        
+        if slow:
+            self.logger.warning(f"[SLOW] Request {trace.request_id} took {latency:.2f}s, profile: {path}")
+        return path
+    
+    def _write(self, trace, latency, slow) -> Path:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{trace.request_id}"
+        
+        report = {
+            "request_id": trace.request_id,
+            "timestamp": datetime.now().isoformat(),
+            "mode": trace.mode,
+            "slow": slow,
+            "latency_s": round(latency, 4),
+            "stages_s": {stage: round(seconds, 4) for stage, seconds in trace.stages.items()},
+            **trace.info
+        }
+        
+        if trace.mode == "cprofile":
+            prof_path = self.profile_dir / f"{stem}.prof"
+            trace.profile.dump_stats(str(prof_path))
+            report["profile_file"] = prof_path.name
+            
+            summary = io.StringIO()
+            pstats.Stats(trace.profile, stream=summary).sort_stats("cumulative").print_stats(25)
+            report["top_functions"] = summary.getvalue().splitlines()
+        else:
+            #Collapsed stacks, ready for flamegraph tools
+            top_stacks = sorted(trace.samples.items(), key=lambda item: item[1], reverse=True)
+            report["sample_interval_s"] = self.config.PROFILE_SAMPLE_INTERVAL
+            report["stacks"] = [f"{stack} {count}" for stack, count in top_stacks[:200]]
+        
+        json_path = self.profile_dir / f"{stem}.json"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        
+        self.captured += 1
+        self._enforce_budget()
+        return json_path
+    
+    def _enforce_budget(self):
+        """Delete the oldest captures beyond PROFILE_MAX_BYTES"""
+        with self.disk_lock:
+            files = sorted(
+                (p for p in self.profile_dir.iterdir() if p.suffix in (".json", ".prof")),
+                key=lambda p: p.stat().st_mtime
+            )
+            total = sum(p.stat().st_size for p in files)
+            for path in files:
+                if total <= self.config.PROFILE_MAX_BYTES:
+                    break
+                total -= path.stat().st_size
+                path.unlink(missing_ok=True)
+
 # =============================================================================
 # EMBEDDED CHAT PIPELINE
 # =============================================================================
@@ -361,12 +1749,16 @@ YuktiAI is an intelligent AI assistant that provides answers.
 class YuktiChatPipeline:
     """Embedded chat pipeline"""
     
-    def __init__(self):
-        self.config = YuktiConfig()
-        self.ollama_handler = YuktiOllamaHandler(self.config)
-        self.memory_handler = YuktiMemoryHandler(self.config)
-        self.formatter = YuktiResponseFormatter(self.config)
-        self.knowledge_base = YuktiKnowledgeBase()
+    def __init__(self, config=None, ollama_handler=None, memory_handler=None,
+                 formatter=None, knowledge_base=None, summarizer=None, profiler=None):
+        #Components can be shared across sessions (see YuktiSessionManager)
+        self.config = config or YuktiConfig()
+        self.ollama_handler = ollama_handler or YuktiOllamaHandler(self.config)
+        self.memory_handler = memory_handler or YuktiMemoryHandler(self.config)
+        self.formatter = formatter or YuktiResponseFormatter(self.config)
+        self.knowledge_base = knowledge_base or YuktiKnowledgeBase()
+        self.summarizer = summarizer or YuktiSummarizer(self.config, self.ollama_handler)
+        self.profiler = profiler or YuktiRequestProfiler(self.config)
         self.initialized = False
         
         #Setup logging
@@ -427,39 +1819,80 @@ class YuktiChatPipeline:
         if not user_input or not user_input.strip():
             return "Please provide a question or message for me to respond to."
         
+        trace = self.profiler.begin()
         try:
             #Check knowledge base first
             kb_response = self.knowledge_base.search_knowledge(user_input)
+            trace.mark("knowledge_base")
             if kb_response:
                 self.memory_handler.add_conversation(user_input, kb_response)
+                if self.memory_handler.has_pending():
+                    self.summarizer.schedule(self.memory_handler)
                 return kb_response
             
             #Get conversation context
-            context = self.memory_handler.get_recent_context(num_recent=2)
-            
-            #Prepare prompt
-            if context:
-                full_prompt = f"Previous context:\n{context}\n\nCurrent question: {user_input.strip()}"
-            else:
-                full_prompt = user_input.strip()
-            
-            #Generate AI response
-            raw_response = self.ollama_handler.generate_response(full_prompt)
+            context = self.memory_handler.get_recent_context(num_recent=self.config.CONTEXT_TURNS)
+            trace.mark("context")
             
-            if not raw_response:
-                return "I apologize, but I couldn't generate a response. Please try again."
+            #Split compound questions when there are spare backend slots
+            parts = [user_input]
+            if self.config.DECOMPOSE_QUERIES and self.ollama_handler.slot_count() > 1:
+                parts = self.formatter.split_compound_query(user_input, self.config.DECOMPOSE_MAX_PARTS)
             
-            #Format response
-            formatted_response = self.formatter.format_final_response(raw_response, user_input)
+            if len(parts) > 1:
+                formatted_response = self.answer_in_parts(user_input, parts, context)
+                trace.mark("generate")
+            else:
+                #Prepare prompt
+                if context:
+                    full_prompt = f"Previous context:\n{context}\n\nCurrent question: {user_input.strip()}"
+                else:
+                    full_prompt = user_input.strip()
+                
+                #Generate AI response
+                query_type = self.formatter.detect_query_type(user_input)
+                trace.info["query_type"] = query_type
+                raw_response = self.ollama_handler.generate_response(full_prompt, query_type=query_type)
+                trace.mark("generate")
+                
+                if not raw_response:
+                    return "I apologize, but I couldn't generate a response. Please try again."
+                
+                #Format response
+                formatted_response = self.formatter.format_final_response(raw_response, user_input)
+                trace.mark("format")
             
             #Add to memory
             self.memory_handler.add_conversation(user_input, formatted_response)
             
+            #Compact dropped turns off the request path
+            if self.memory_handler.has_pending():
+                self.summarizer.schedule(self.memory_handler)
+            trace.mark("memory")
+            
             return formatted_response
             
         except Exception as e:
             self.logger.error(f"[ERROR] Error generating response: {e}")
+            trace.info["error"] = str(e)
             return "I apologize, but I encountered an error while processing your request. Please try again."
+        finally:
+            self.profiler.finish(trace)
+    
+    def answer_in_parts(self, user_input: str, parts: list, context: str = "") -> str:
+        """Generate the parts of a compound question concurrently and merge them"""
+        prompts = []
+        for part in parts:
+            prompt = f"Full question: {user_input.strip()}\n\nAnswer only this part: {part}"
+            if context:
+                prompt = f"Previous context:\n{context}\n\n{prompt}"
+            prompts.append(prompt)
+        
+        self.logger.info(f"[FANOUT] Answering {len(parts)} parts concurrently")
+        query_types = [self.formatter.detect_query_type(part) for part in parts]
+        raw_responses = self.ollama_handler.generate_many(prompts, query_types)
+        
+        return self.formatter.merge_responses(list(zip(parts, raw_responses)))
     
     def clear_conversation(self):
         """Clear conversation memory"""
@@ -477,9 +1910,517 @@ class YuktiChatPipeline:
             "model_available": model_status,
             "current_model": self.config.OLLAMA_MODEL,
             "memory_stats": memory_stats,
+            "resilience": self.ollama_handler.get_resilience_stats(),
+            "summarizer": self.summarizer.get_stats(),
+            "generation_budgets": self.ollama_handler.get_budget_stats(),
+            "memory": memory_profiler.get_report(self),
             "config": self.config.get_config_dict()
         }
 
+# =============================================================================
+# EMBEDDED SESSION MANAGER
+# =============================================================================
+
+def estimate_object_size(obj, seen=None) -> int:
+    """Approximate deep size of an object graph in bytes"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_object_size(key, seen) + estimate_object_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        for item in obj:
+            size += estimate_object_size(item, seen)
+    
+    return size
+
+class YuktiSessionRecord:
+    """Compact per-user session state"""
+    
+    __slots__ = ('session_id', 'pipeline', 'chat_history', 'last_access', 'in_use')
+    
+    def __init__(self, session_id: str, pipeline, chat_history=None):
+        self.session_id = session_id
+        self.pipeline = pipeline
+        self.chat_history = chat_history if chat_history is not None else []
+        self.last_access = time.time()
+        self.in_use = 0
+    
+    def estimate_size(self) -> int:
+        """Bytes owned by this session (shared components excluded)"""
+        seen = set()
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.pipeline)
+            + estimate_object_size(self.chat_history, seen)
+            + self.pipeline.memory_handler.estimate_size(seen)
+        )
+
+class YuktiSessionManager:
+    """Shares one pipeline's stateless components across many user sessions
+    
+    The Ollama handler (and with it the HTTP connection pool), formatter and
+    knowledge base are created once. Each session only owns its memory handler
+    and chat history. Idle sessions are evicted by LRU/TTL to JSON files under
+    SESSION_STORE_DIR and restored transparently on their next request.
+    Sessions held through use_session() are never evicted mid-request, and
+    stored files left unclaimed for SESSION_STORE_TTL are deleted.
+    """
+    
+    def __init__(self, config=None):
+        self.config = config or YuktiConfig()
+        self.ollama_handler = YuktiOllamaHandler(self.config)
+        self.formatter = YuktiResponseFormatter(self.config)
+        self.knowledge_base = YuktiKnowledgeBase()
+        self.summarizer = YuktiSummarizer(self.config, self.ollama_handler)
+        self.profiler = YuktiRequestProfiler(self.config)
+        self.initialized = False
+        
+        self.sessions = OrderedDict()
+        self.lock = threading.RLock()
+        self.evicted_count = 0
+        self.restored_count = 0
+        self.last_store_sweep = 0.0
+        self.stats_cache = {}
+        self.stats_lock = threading.Lock()
+        
+        self.store_dir = Path(__file__).parent.absolute() / self.config.SESSION_STORE_DIR
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.logger = logging.getLogger('YuktiSessionManager')
+        self.expire_stored()
+        
+        if self.config.MEMORY_TRACE_ON_START:
+            memory_profiler.start()
+    
+    def _new_pipeline(self):
+        pipeline = YuktiChatPipeline(
+            config=self.config,
+            ollama_handler=self.ollama_handler,
+            memory_handler=YuktiMemoryHandler(self.config),
+            formatter=self.formatter,
+            knowledge_base=self.knowledge_base,
+            summarizer=self.summarizer,
+            profiler=self.profiler
+        )
+        pipeline.initialized = self.initialized
+        return pipeline
+    
+    def initialize(self):
+        """Check Ollama once for all sessions"""
+        with self.lock:
+            if self.initialized:
+                return {
+                    "success": True,
+                    "ollama_status": True,
+                    "model_status": True,
+                    "message": "YuktiAI initialized successfully!"
+                }
+            
+            result = self._new_pipeline().initialize_pipeline()
+            self.initialized = result["success"]
+            for record in self.sessions.values():
+                record.pipeline.initialized = self.initialized
+            return result
+    
+    def create_session(self) -> str:
+        """Create a new session and return its id"""
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[session_id] = YuktiSessionRecord(session_id, self._new_pipeline())
+            self._evict_locked()
+        return session_id
+    
+    def _lookup_locked(self, session_id: str) -> YuktiSessionRecord:
+        record = self.sessions.get(session_id)
+        if record is None:
+            record = self._restore(session_id)
+            self.sessions[session_id] = record
+        else:
+            self.sessions.move_to_end(session_id)
+        
+        record.last_access = time.time()
+        return record
+    
+    def get_session(self, session_id: str) -> YuktiSessionRecord:
+        """Get a session, restoring it from storage if it was evicted"""
+        with self.lock:
+            record = self._lookup_locked(session_id)
+            self._evict_locked()
+            return record
+    
+    def get_pipeline(self, session_id: str):
+        """Get the chat pipeline of a session"""
+        return self.get_session(session_id).pipeline
+    
+    @contextmanager
+    def use_session(self, session_id: str):
+        """Hold a session for the duration of a request so it is not evicted"""
+        with self.lock:
+            record = self._lookup_locked(session_id)
+            record.in_use += 1
+            self._evict_locked()
+        try:
+            yield record
+        finally:
+            with self.lock:
+                record.in_use -= 1
+                record.last_access = time.time()
+    
+    def _session_file(self, session_id: str) -> Path:
+        if not session_id.isalnum():
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return self.store_dir / f"{session_id}.json"
+    
+    def _persist(self, record: YuktiSessionRecord):
+        state = {
+            "session_id": record.session_id,
+            "last_access": record.last_access,
+            "memory": record.pipeline.memory_handler.export_state(),
+            "chat_history": record.chat_history
+        }
+        
+        path = self._session_file(record.session_id)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def _restore(self, session_id: str) -> YuktiSessionRecord:
+        pipeline = self._new_pipeline()
+        path = self._session_file(session_id)
+        
+        if not path.exists():
+            return YuktiSessionRecord(session_id, pipeline)
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            pipeline.memory_handler.import_state(state.get("memory", {}))
+            path.unlink(missing_ok=True)
+            self.restored_count += 1
+            return YuktiSessionRecord(session_id, pipeline, state.get("chat_history", []))
+        except Exception as e:
+            self.logger.error(f"[ERROR] Failed to restore session {session_id}: {e}")
+            return YuktiSessionRecord(session_id, pipeline)
+    
+    def _evict_locked(self):
+        """Evict sessions past the TTL and over the resident limit"""
+        now = time.time()
+        cutoff = now - self.config.SESSION_TTL
+        
+        for session_id, record in list(self.sessions.items()):
+            expired = record.last_access < cutoff
+            over_limit = len(self.sessions) > self.config.MAX_RESIDENT_SESSIONS
+            if not (expired or over_limit):
+                break
+            
+            #A request is still writing to this session
+            if record.in_use:
+                continue
+            
+            del self.sessions[session_id]
+            try:
+                self._persist(record)
+                self.evicted_count += 1
+            except Exception as e:
+                self.logger.error(f"[ERROR] Failed to persist session {session_id}: {e}")
+    
+        if now - self.last_store_sweep > self.config.SESSION_TTL:
+            self.expire_stored()
+    
+    def evict_idle(self):
+        """Run an eviction sweep"""
+        with self.lock:
+            self._evict_locked()
+    
+    def expire_stored(self):
+        """Delete stored sessions nobody came back for within SESSION_STORE_TTL"""
+        self.last_store_sweep = time.time()
+        cutoff = self.last_store_sweep - self.config.SESSION_STORE_TTL
+        
+        for path in self.store_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError as e:
+                self.logger.error(f"[ERROR] Failed to expire stored session {path.name}: {e}")
+    
+    def clear_session(self, session_id: str):
+        """Clear a session's chat history and conversation memory"""
+        with self.use_session(session_id) as record:
+            record.chat_history.clear()
+            record.pipeline.clear_conversation()
+    
+    def _cached(self, key: str, compute):
+        """Reuse a report for SESSION_STATS_TTL seconds; building one walks every session"""
+        now = time.monotonic()
+        with self.stats_lock:
+            cached = self.stats_cache.get(key)
+            if cached is not None and now - cached[0] < self.config.SESSION_STATS_TTL:
+                return cached[1]
+        
+        value = compute()
+        with self.stats_lock:
+            self.stats_cache[key] = (now, value)
+        return value
+    
+    def get_memory_report(self) -> dict:
+        """Per-component memory estimates across all resident sessions"""
+        return self._cached("memory_report", self._build_memory_report)
+    
+    def _build_memory_report(self) -> dict:
+        with self.lock:
+            records = list(self.sessions.values())
+        
+        seen = set()
+        chat_history = sum(estimate_object_size(record.chat_history, seen) for record in records)
+        memory_handlers = sum(record.pipeline.memory_handler.estimate_size(seen) for record in records)
+        
+        report = memory_profiler.get_report()
+        report["components"] = memory_profiler.component_sizes(self.ollama_handler, self.knowledge_base)
+        report["components"].update({
+            "chat_history": chat_history,
+            "memory_handlers": memory_handlers,
+            "session_records": sum(sys.getsizeof(record) + sys.getsizeof(record.pipeline) for record in records)
+        })
+        report["resident_sessions"] = len(records)
+        report["bytes_per_session"] = (chat_history + memory_handlers) // len(records) if records else 0
+        return report
+    
+    def get_stats(self):
+        """Get resident session count and memory estimates"""
+        return self._cached("stats", self._build_stats)
+    
+    def _build_stats(self):
+        with self.lock:
+            records = list(self.sessions.values())
+            evicted_count = self.evicted_count
+            restored_count = self.restored_count
+        
+        session_bytes = sum(record.estimate_size() for record in records)
+        
+        return {
+            "resident_sessions": len(records),
+            "max_resident_sessions": self.config.MAX_RESIDENT_SESSIONS,
+            "session_ttl": self.config.SESSION_TTL,
+            "evicted_sessions": evicted_count,
+            "restored_sessions": restored_count,
+            "session_memory_bytes": session_bytes,
+            "avg_session_bytes": session_bytes // len(records) if records else 0
+        }
+
+# =============================================================================
+# EMBEDDED MEMORY PROFILER
+# =============================================================================
+
+def get_process_rss() -> int:
+    """Resident set size of this process in bytes (0 if unknown)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        #Linux reports KiB, macOS bytes; this is the peak, not current
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return 0
+
+class YuktiMemoryProfiler:
+    """tracemalloc snapshots, allocation sites and per-component estimates
+    
+    Tracing is off until start() is called (or MEMORY_TRACE_ON_START is set)
+    because it slows allocation-heavy code. While tracing, snapshots can be
+    dumped to MEMORY_DUMP_DIR periodically so `python init.py --memory-report`
+    can inspect a running process from the outside.
+    """
+    
+    def __init__(self, config=None):
+        self.config = config or YuktiConfig()
+        self.snapshots = OrderedDict()
+        self.dump_dir = Path(__file__).parent.absolute() / self.config.MEMORY_DUMP_DIR
+        self.dump_thread = None
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('YuktiMemoryProfiler')
+    
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+    
+    def start(self):
+        """Start tracing allocations and the periodic dump, if configured"""
+        self.stopped.clear()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.config.MEMORY_TRACE_FRAMES)
+            self.logger.info("[MEMORY] tracemalloc started")
+        
+        interval = self.config.MEMORY_DUMP_INTERVAL
+        with self.lock:
+            if interval > 0 and self.dump_thread is None:
+                self.dump_thread = threading.Thread(
+                    target=self._dump_periodically,
+                    args=(interval,),
+                    name="yukti-memory-dump",
+                    daemon=True
+                )
+                self.dump_thread.start()
+    
+    def stop(self):
+        """Stop tracing and the periodic dump, and drop in-memory snapshots"""
+        self.stopped.set()
+        tracemalloc.stop()
+        with self.lock:
+            self.snapshots.clear()
+    
+    def take_snapshot(self, label: str = None, start: bool = True) -> str:
+        """Take a snapshot and keep it under a label, starting tracing if allowed"""
+        if not tracemalloc.is_tracing():
+            if not start:
+                raise RuntimeError("tracemalloc is not tracing")
+            self.start()
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        label = label or datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        
+        with self.lock:
+            self.snapshots[label] = snapshot
+            while len(self.snapshots) > self.config.MEMORY_SNAPSHOT_LIMIT:
+                self.snapshots.popitem(last=False)
+        return label
+    
+    def _get_snapshot(self, label: str = None):
+        with self.lock:
+            if not self.snapshots:
+                raise ValueError("No memory snapshots taken")
+            if label is None:
+                return next(reversed(self.snapshots.values()))
+            if label not in self.snapshots:
+                raise ValueError(f"Unknown memory snapshot: {label}")
+            return self.snapshots[label]
+    
+    def top_allocations(self, label: str = None, limit: int = 10) -> list:
+        """Largest allocation sites of a snapshot (latest by default)"""
+        stats = self._get_snapshot(label).statistics('lineno')
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "count": stat.count
+            }
+            for stat in stats[:limit]
+        ]
+    
+    def compare(self, old_label: str, new_label: str, limit: int = 10) -> list:
+        """Allocation sites that grew the most between two snapshots"""
+        old = self._get_snapshot(old_label)
+        new = self._get_snapshot(new_label)
+        stats = new.compare_to(old, 'lineno')
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size_bytes": stat.size
+            }
+            for stat in stats[:limit]
+        ]
+    
+    def dump_snapshot(self, label: str = None, start: bool = True) -> Path:
+        """Write a snapshot to MEMORY_DUMP_DIR, keeping the newest few"""
+        label = self.take_snapshot(label, start)
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        
+        path = self.dump_dir / f"{label}.snapshot"
+        self._get_snapshot(label).dump(str(path))
+        
+        dumps = sorted(self.dump_dir.glob("*.snapshot"), key=lambda p: p.stat().st_mtime)
+        for old_path in dumps[:-self.config.MEMORY_DUMP_KEEP]:
+            old_path.unlink(missing_ok=True)
+        return path
+    
+    def load_dumps(self) -> list:
+        """Load dumped snapshots (oldest first) and return their labels"""
+        if not self.dump_dir.exists():
+            return []
+        
+        labels = []
+        for path in sorted(self.dump_dir.glob("*.snapshot"), key=lambda p: p.stat().st_mtime):
+            with self.lock:
+                self.snapshots[path.stem] = tracemalloc.Snapshot.load(str(path))
+            labels.append(path.stem)
+        return labels
+    
+    def _dump_periodically(self, interval: float):
+        while not self.stopped.wait(interval) and tracemalloc.is_tracing():
+            try:
+                self.dump_snapshot(start=False)
+            except Exception as e:
+                self.logger.error(f"[ERROR] Memory snapshot dump failed: {e}")
+        with self.lock:
+            self.dump_thread = None
+    
+    def component_sizes(self, ollama_handler, knowledge_base, memory_handler=None) -> dict:
+        """Approximate bytes held by shared components (and one memory handler)"""
+        client = ollama_handler.client
+        caches = 0
+        if client is not None:
+            seen = set()
+            caches = sum(
+                estimate_object_size(window, seen)
+                for window in (client.ttft_samples, client.latencies,
+                               client.counterfactual_latencies, client.hedge_savings)
+            )
+        
+        sizes = {
+            "knowledge_base": estimate_object_size(knowledge_base.knowledge),
+            "latency_caches": caches,
+            "generation_budgets": estimate_object_size(ollama_handler.budget.samples)
+        }
+        if memory_handler is not None:
+            sizes["memory_handler"] = memory_handler.estimate_size()
+        return sizes
+    
+    def get_report(self, pipeline=None, limit: int = 0) -> dict:
+        """Memory report for get_system_status and the CLI"""
+        report = {
+            "process_rss_bytes": get_process_rss(),
+            "tracing": tracemalloc.is_tracing(),
+            "snapshots": list(self.snapshots)
+        }
+        
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report["traced_current_bytes"] = current
+            report["traced_peak_bytes"] = peak
+        
+        if pipeline is not None:
+            report["components"] = self.component_sizes(
+                pipeline.ollama_handler, pipeline.knowledge_base, pipeline.memory_handler
+            )
+        
+        if limit and self.snapshots:
+            report["top_allocations"] = self.top_allocations(limit=limit)
+        
+        return report
+
+memory_profiler = YuktiMemoryProfiler()
+
 # =============================================================================
 # MAIN FUNCTIONS
 # =============================================================================
@@ -522,8 +2463,52 @@ def quick_setup():
             'message': 'YuktiAI setup failed. Please check the logs.'
         }
 
-def main():
+def memory_report(limit: int = 15):
+    """Print per-session memory cost and allocation sites of dumped snapshots"""
+    config = YuktiConfig()
+    
+    #Cost of one session with a full conversation memory; distinct strings per
+    #turn, since repeated literals are shared objects and would be counted once
+    pipeline = YuktiChatPipeline(config)
+    for i in range(config.MEMORY_SIZE):
+        pipeline.memory_handler.add_conversation(f"{i:03d}".ljust(200, "q"), f"{i:03d}".ljust(1500, "a"))
+    pipeline.memory_handler.set_summary("s" * config.SUMMARY_MAX_CHARS)
+    pipeline.memory_handler.pending.clear()
+    
+    report = {
+        "this_process": memory_profiler.get_report(pipeline),
+        "full_session_estimate_bytes": pipeline.memory_handler.estimate_size()
+    }
+    
+    #Snapshots dumped by a running process (MEMORY_TRACE_ON_START / MEMORY_DUMP_INTERVAL)
+    labels = memory_profiler.load_dumps()
+    report["dumped_snapshots"] = labels
+    if labels:
+        report["top_allocations"] = memory_profiler.top_allocations(labels[-1], limit)
+    if len(labels) >= 2:
+        report["growth"] = {
+            "from": labels[0],
+            "to": labels[-1],
+            "top_growth": memory_profiler.compare(labels[0], labels[-1], limit)
+        }
+    else:
+        report["growth"] = f"Need two snapshots in {memory_profiler.dump_dir} to show growth"
+    
+    print(json.dumps(report, indent=2))
+    return report
+
+def main(argv=None):
     """Main function"""
+    parser = argparse.ArgumentParser(description="YuktiAI setup and diagnostics")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Show per-session memory cost and top allocation sites from dumped snapshots")
+    parser.add_argument("--top", type=int, default=15, help="Number of allocation sites to show")
+    args = parser.parse_args(argv)
+    
+    if args.memory_report:
+        memory_report(args.top)
+        return
+    
     print(f"""
 YuktiAI Unified System
 Version: {__version__}
@@ -562,9 +2547,13 @@ __all__ = [
     '__description__',
     'YuktiChatPipeline',
     'YuktiConfig',
+    'YuktiKnowledgeBase',
+    'YuktiSessionManager',
     'initialize_yukti',
     'create_chat_pipeline',
     'quick_setup',
+    'memory_profiler',
+    'memory_report',
     'main'
 ]
 
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Concurrent load generator for YuktiAI capacity planning
+
+Simulates N concurrent users holding multi-turn conversations against
+YuktiChatPipeline (through YuktiSessionManager, as the Streamlit app does),
+ramping concurrency step by step. Runs against a real Ollama or against a
+built-in simulator with a fixed number of decode slots.
+
+Reports throughput, latency percentiles, queueing delay and error rate per
+step, and the knee where latency starts to degrade.
+
+Queueing delay is estimated as client-observed generation time minus the
+server-reported total_duration of the generation.
+
+Usage:
+    python loadtest.py --simulate --levels 1,2,4,8,16 --step-duration 20
+    python loadtest.py --host http://localhost:11434 --profile coding
+"""
+
+import argparse
+import http.server
+import json
+import math
+import random
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+#Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from init import YuktiConfig, YuktiSessionManager, _percentile
+
+# =============================================================================
+# WORKLOAD PROFILES
+# =============================================================================
+
+PROMPT_TEMPLATES = {
+    "code": [
+        "Write a Python function that {topic}.",
+        "Show me code for a program that {topic}.",
+    ],
+    "tutorial": [
+        "How to {topic}? Give me the steps.",
+        "Write a tutorial on how to {topic}.",
+    ],
+    "explanation": [
+        "Explain why people {topic}.",
+        "What is the best way to {topic}? Explain.",
+    ],
+    "list": [
+        "List examples of tools that {topic}.",
+        "Give a list of the main types of systems that {topic}.",
+    ],
+    "comparison": [
+        "Compare two approaches that {topic}.",
+        "What is the difference between libraries that {topic}?",
+    ],
+    "general": [
+        "Tell me something interesting on how teams {topic}.",
+        "Help me plan a week where I {topic}.",
+    ],
+}
+
+TOPICS = [
+    "parse large CSV files",
+    "schedule background jobs",
+    "cache database queries",
+    "validate user input",
+    "learn a new language quickly",
+    "organise a small project",
+    "deploy a web service",
+    "monitor memory usage",
+]
+
+FILLER_SENTENCES = [
+    "Keep in mind that the data set keeps growing every week.",
+    "The team is small and prefers simple solutions.",
+    "We are running on a single laptop for now.",
+    "Performance matters more than elegance here.",
+    "Please keep the answer practical and concrete.",
+    "Assume the reader already knows basic programming.",
+]
+
+#Request mix profiles: query type -> weight
+PROFILES = {
+    "balanced": {"code": 2, "tutorial": 2, "explanation": 2, "list": 1, "comparison": 1, "general": 2},
+    "coding": {"code": 6, "tutorial": 2, "explanation": 1, "comparison": 1},
+    "chatty": {"general": 6, "explanation": 2, "list": 1, "comparison": 1},
+}
+
+class YuktiWorkload:
+    """Generates prompts following a request mix and prompt-length distribution"""
+    
+    def __init__(self, profile: str, prompt_words_median: int, prompt_words_sigma: float, seed=None):
+        self.mix = PROFILES[profile]
+        self.prompt_words_median = prompt_words_median
+        self.prompt_words_sigma = prompt_words_sigma
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+    
+    def next_prompt(self):
+        """Return (query_type, prompt)"""
+        with self.lock:
+            query_type = self.random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+            prompt = self.random.choice(PROMPT_TEMPLATES[query_type]).format(topic=self.random.choice(TOPICS))
+            
+            #Log-normal prompt length, padded with context sentences
+            target_words = int(self.random.lognormvariate(math.log(self.prompt_words_median), self.prompt_words_sigma))
+            parts = [prompt]
+            words = len(prompt.split())
+            while words < target_words:
+                sentence = self.random.choice(FILLER_SENTENCES)
+                parts.append(sentence)
+                words += len(sentence.split())
+        
+        return query_type, " ".join(parts)
+
+# =============================================================================
+# OLLAMA SIMULATOR
+# =============================================================================
+
+class YuktiOllamaSimulator:
+    """Local stand-in for Ollama with a fixed number of decode slots
+    
+    Requests wait for a free slot (queueing), spend prefill time proportional
+    to the prompt length, then stream tokens at a fixed decode rate.
+    """
+    
+    def __init__(self, port=0, slots=4, decode_tps=40.0, prefill_tps=500.0,
+                 mean_output_tokens=200, error_rate=0.0, model=None):
+        self.slots = threading.BoundedSemaphore(slots)
+        self.decode_tps = decode_tps
+        self.prefill_tps = prefill_tps
+        self.mean_output_tokens = mean_output_tokens
+        self.error_rate = error_rate
+        self.model = model or YuktiConfig.OLLAMA_MODEL
+        
+        simulator = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    simulator._send_json(self, {"models": [{"name": simulator.model}]})
+                else:
+                    self.send_error(404)
+            
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                simulator._generate(self, json.loads(self.rfile.read(length) or b"{}"))
+        
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        self.thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def _send_json(self, handler, payload, status=200):
+        body = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+    
+    def _generate(self, handler, request):
+        if random.random() < self.error_rate:
+            self._send_json(handler, {"error": "simulated failure"}, status=500)
+            return
+        
+        options = request.get("options", {})
+        num_predict = options.get("num_predict", 1000)
+        output_tokens = max(1, min(num_predict, int(random.expovariate(1.0 / self.mean_output_tokens))))
+        prompt_tokens = len(request.get("prompt", "").split())
+        
+        with self.slots:
+            started = time.monotonic()
+            time.sleep(prompt_tokens / self.prefill_tps)
+            
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/x-ndjson")
+            handler.end_headers()
+            
+            try:
+                #Emit tokens in small batches to keep timer overhead low
+                emitted = 0
+                while emitted < output_tokens:
+                    batch = min(8, output_tokens - emitted)
+                    time.sleep(batch / self.decode_tps)
+                    for _ in range(batch):
+                        chunk = {"model": self.model, "response": "token ", "done": False}
+                        handler.wfile.write((json.dumps(chunk) + "\n").encode())
+                    handler.wfile.flush()
+                    emitted += batch
+                
+                done_reason = "length" if output_tokens >= num_predict else "stop"
+                final = {
+                    "model": self.model,
+                    "response": "",
+                    "done": True,
+                    "done_reason": done_reason,
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": output_tokens,
+                    "total_duration": int((time.monotonic() - started) * 1e9)
+                }
+                handler.wfile.write((json.dumps(final) + "\n").encode())
+                handler.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                #Client cancelled the request
+                pass
+
+# =============================================================================
+# LOAD GENERATOR
+# =============================================================================
+
+class PipelineTarget:
+    """Sends user turns to YuktiChatPipeline sessions"""
+    
+    name = "pipeline"
+    
+    def __init__(self, config):
+        self.manager = YuktiSessionManager(config)
+        init_result = self.manager.initialize()
+        if not init_result["success"]:
+            raise RuntimeError(init_result["message"])
+    
+    def new_session(self):
+        return self.manager.create_session()
+    
+    def send(self, session_id, prompt):
+        """Send one turn; returns (ok, server_seconds or None)"""
+        with self.manager.use_session(session_id) as session:
+            pipeline = session.pipeline
+            pipeline.ollama_handler.local.last_result = None
+            pipeline.get_response(prompt)
+            result = pipeline.ollama_handler.get_last_generation()
+        
+        if result is None:
+            #Answered without generation (knowledge base)
+            return True, None
+        if "error" in result:
+            return False, None
+        
+        total_duration = (result.get("stats") or {}).get("total_duration")
+        return True, total_duration / 1e9 if total_duration else None
+
+class YuktiLoadGenerator:
+    """Closed-loop load generator ramping the number of concurrent users"""
+    
+    def __init__(self, target, workload, turns=4, think_time=2.0, step_duration=30.0):
+        self.target = target
+        self.workload = workload
+        self.turns = turns
+        self.think_time = think_time
+        self.step_duration = step_duration
+    
+    def _user(self, stop_at, samples, lock):
+        rng = random.Random()
+        session_id = self.target.new_session()
+        turn = 0
+        
+        while time.monotonic() < stop_at:
+            if turn >= self.turns:
+                #Conversation over: the next one starts with a fresh session
+                session_id = self.target.new_session()
+                turn = 0
+            
+            query_type, prompt = self.workload.next_prompt()
+            started = time.monotonic()
+            try:
+                ok, server_seconds = self.target.send(session_id, prompt)
+            except Exception:
+                ok, server_seconds = False, None
+            finished = time.monotonic()
+            
+            latency = finished - started
+            queue_delay = max(latency - server_seconds, 0.0) if server_seconds is not None else None
+            with lock:
+                samples.append((started, finished, latency, queue_delay, ok, query_type))
+            
+            turn += 1
+            if self.think_time > 0:
+                time.sleep(rng.expovariate(1.0 / self.think_time))
+    
+    def run_step(self, users: int) -> dict:
+        """Run one concurrency level and summarize it"""
+        samples = []
+        lock = threading.Lock()
+        step_started = time.monotonic()
+        stop_at = step_started + self.step_duration
+        
+        threads = [
+            threading.Thread(target=self._user, args=(stop_at, samples, lock), daemon=True)
+            for _ in range(users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        window = [s for s in samples if s[1] <= stop_at]
+        latencies = [s[2] for s in window if s[4]]
+        queue_delays = [s[3] for s in window if s[4] and s[3] is not None]
+        errors = sum(1 for s in window if not s[4])
+        
+        return {
+            "users": users,
+            "requests": len(window),
+            "throughput_rps": round(len(latencies) / self.step_duration, 3),
+            "latency_p50_s": round(_percentile(latencies, 50), 3),
+            "latency_p95_s": round(_percentile(latencies, 95), 3),
+            "latency_p99_s": round(_percentile(latencies, 99), 3),
+            "queue_delay_mean_s": round(sum(queue_delays) / len(queue_delays), 3) if queue_delays else 0.0,
+            "queue_delay_p95_s": round(_percentile(queue_delays, 95), 3),
+            "error_rate": round(errors / len(window), 4) if window else 0.0
+        }
+    
+    def ramp(self, levels, on_step=None):
+        results = []
+        for users in levels:
+            result = self.run_step(users)
+            results.append(result)
+            if on_step:
+                on_step(result)
+        return results
+
+def find_knee(results, latency_factor=2.0, min_throughput_gain=0.05):
+    """Last level before p95 latency degrades or throughput stops scaling"""
+    if not results:
+        return None
+    
+    baseline = results[0]["latency_p95_s"] or None
+    knee = results[0]
+    for previous, current in zip(results, results[1:]):
+        if baseline and current["latency_p95_s"] > latency_factor * baseline:
+            break
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 + min_throughput_gain):
+            break
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            break
+        knee = current
+    return knee
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="YuktiAI concurrent load generator")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated concurrent user counts")
+    parser.add_argument("--step-duration", type=float, default=30.0, help="Seconds per concurrency level")
+    parser.add_argument("--turns", type=int, default=4, help="Turns per conversation")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mean think time between turns (s)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="balanced", help="Request mix profile")
+    parser.add_argument("--prompt-words", type=int, default=20, help="Median prompt length in words")
+    parser.add_argument("--prompt-sigma", type=float, default=0.6, help="Log-normal sigma of prompt length")
+    parser.add_argument("--seed", type=int, default=None, help="Workload random seed")
+    parser.add_argument("--host", default=None, help="Ollama host (default: YuktiConfig.OLLAMA_HOST)")
+    parser.add_argument("--latency-factor", type=float, default=2.0, help="p95 growth that marks the knee")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    
+    simulator = parser.add_argument_group("simulator")
+    simulator.add_argument("--simulate", action="store_true", help="Run against a local Ollama simulator")
+    simulator.add_argument("--sim-slots", type=int, default=4, help="Concurrent decode slots")
+    simulator.add_argument("--sim-decode-tps", type=float, default=40.0, help="Decode tokens per second per slot")
+    simulator.add_argument("--sim-prefill-tps", type=float, default=500.0, help="Prefill tokens per second")
+    simulator.add_argument("--sim-output-tokens", type=int, default=200, help="Mean output tokens")
+    simulator.add_argument("--sim-error-rate", type=float, default=0.0, help="Fraction of failing requests")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    
+    simulator = None
+    if args.simulate:
+        simulator = YuktiOllamaSimulator(
+            slots=args.sim_slots,
+            decode_tps=args.sim_decode_tps,
+            prefill_tps=args.sim_prefill_tps,
+            mean_output_tokens=args.sim_output_tokens,
+            error_rate=args.sim_error_rate
+        ).start()
+    
+    config = YuktiConfig()
+    host = simulator.url if simulator else (args.host or config.OLLAMA_HOST)
+    config.OLLAMA_HOST = host
+    config.OLLAMA_HOSTS = [host]
+    config.MAX_RESIDENT_SESSIONS = max(config.MAX_RESIDENT_SESSIONS, max(levels) * 2)
+    
+    #Keep evicted sessions, generation stats and profiles out of data/ and logs/
+    scratch = tempfile.TemporaryDirectory(prefix="yukti-loadtest-")
+    config.SESSION_STORE_DIR = str(Path(scratch.name) / "sessions")
+    config.BUDGET_LOG_FILE = str(Path(scratch.name) / "generation.jsonl")
+    config.PROFILE_DIR = str(Path(scratch.name) / "profiles")
+    
+    print("YuktiAI Load Test")
+    print("=" * 60)
+    print(f"Target: pipeline -> {host}{' (simulator)' if simulator else ''}")
+    print(f"Profile: {args.profile} | turns: {args.turns} | think time: {args.think_time}s | step: {args.step_duration}s")
+    
+    try:
+        target = PipelineTarget(config)
+    except Exception as e:
+        print(f"[ERROR] {e}")
+        if simulator:
+            simulator.stop()
+        scratch.cleanup()
+        return 1
+    
+    workload = YuktiWorkload(args.profile, args.prompt_words, args.prompt_sigma, args.seed)
+    generator = YuktiLoadGenerator(target, workload, args.turns, args.think_time, args.step_duration)
+    
+    header = f"{'users':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queue':>8} {'errors':>8}"
+    print("\n" + header)
+    print("-" * len(header))
+    
+    def show(result):
+        print(f"{result['users']:>6} {result['throughput_rps']:>8.2f} {result['latency_p50_s']:>8.2f} "
+              f"{result['latency_p95_s']:>8.2f} {result['latency_p99_s']:>8.2f} "
+              f"{result['queue_delay_mean_s']:>8.2f} {result['error_rate']:>8.2%}")
+    
+    try:
+        results = generator.ramp(levels, on_step=show)
+    except KeyboardInterrupt:
+        print("\n[STOP] Load test interrupted")
+        return 1
+    finally:
+        if simulator:
+            simulator.stop()
+        scratch.cleanup()
+    
+    knee = find_knee(results, args.latency_factor)
+    if knee and knee is results[-1]:
+        print(f"\n[KNEE] No degradation found up to {knee['users']} concurrent users; extend --levels")
+    elif knee:
+        print(f"\n[KNEE] Latency degrades beyond {knee['users']} concurrent users "
+              f"({knee['throughput_rps']:.2f} req/s, p95 {knee['latency_p95_s']:.2f}s)")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"args": vars(args), "results": results, "knee": knee}, f, indent=2)
+        print(f"[OK] Results written to {args.output}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,121 @@
 """
 Simple HTTP server for YuktiAI web interface
+
+Serves the static files with a thread per connection, HTTP/1.1 keep-alive,
+gzip/brotli variants precomputed at startup and sent with sendfile, and
+ETag/Cache-Control headers so browsers revalidate cheaply.
 """
 
+import argparse
+import functools
+import gzip
+import hashlib
 import http.server
-import socketserver
+import mimetypes
+import re
+import shutil
+import socket
+import tempfile
 import webbrowser
 import os
 import sys
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+#Content types worth compressing
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+)
+
+#Fingerprinted file names such as script.3f2a9c1d.js never change content
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.[A-Za-z0-9]+$')
+
+LONG_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+class YuktiStaticAssets:
+    """Static files with precomputed compressed variants"""
+    
+    def __init__(self, directory):
+        self.directory = Path(directory).absolute()
+        self.cache_dir = Path(tempfile.mkdtemp(prefix='yukti-static-'))
+        self.assets = {}
+        self.load()
+    
+    def load(self):
+        """Hash every file and write its gzip/brotli variants"""
+        for path in sorted(self.directory.rglob('*')):
+            relative = path.relative_to(self.directory)
+            if not path.is_file() or any(part.startswith('.') for part in relative.parts):
+                continue
+            
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()[:20]
+            content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+            
+            variants = {'identity': (path, len(data))}
+            if content_type.startswith(COMPRESSIBLE_TYPES):
+                compressors = [('gzip', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+                if brotli is not None:
+                    compressors.append(('br', lambda raw: brotli.compress(raw, quality=11)))
+                
+                for encoding, compress in compressors:
+                    compressed = compress(data)
+                    if len(compressed) < len(data):
+                        variant_path = self.cache_dir / f"{digest}.{encoding}"
+                        variant_path.write_bytes(compressed)
+                        variants[encoding] = (variant_path, len(compressed))
+            
+            self.assets['/' + relative.as_posix()] = {
+                'etag': digest,
+                'content_type': content_type,
+                'cache_control': LONG_CACHE if HASHED_NAME.search(path.name) else REVALIDATE_CACHE,
+                'variants': variants
+            }
+    
+    def get(self, url_path):
+        if url_path.endswith('/'):
+            url_path += 'index.html'
+        return self.assets.get(url_path)
+    
+    def cleanup(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+def parse_accept_encoding(header):
+    """Encodings the client accepts (q > 0)"""
+    accepted = set()
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
 class YuktiHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Custom HTTP request handler"""
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory="web", **kwargs)
+    #Keep-alive connections; idle or slow clients are dropped after the timeout
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+    
+    def __init__(self, *args, directory="web", assets=None, **kwargs):
+        self.assets = assets
+        super().__init__(*args, directory=directory, **kwargs)
     
     def end_headers(self):
         #Add CORS headers
@@ -21,15 +123,101 @@ class YuktiHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
+    
+    def do_GET(self):
+        if not self.send_asset(head_only=False):
+            super().do_GET()
+    
+    def do_HEAD(self):
+        if not self.send_asset(head_only=True):
+            super().do_HEAD()
+    
+    def send_asset(self, head_only):
+        """Serve a precomputed asset; False if the path is not cached"""
+        if self.assets is None:
+            return False
+        
+        url_path = self.path.split('?', 1)[0].split('#', 1)[0]
+        asset = self.assets.get(url_path)
+        if asset is None:
+            return False
+        
+        accepted = parse_accept_encoding(self.headers.get('Accept-Encoding'))
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in asset['variants'] and candidate in accepted:
+                encoding = candidate
+                break
+        
+        etag = f'"{asset["etag"]}"' if encoding == 'identity' else f'"{asset["etag"]}-{encoding}"'
+        
+        #Any representation of the same content counts as a match
+        if_none_match = self.headers.get('If-None-Match', '')
+        tags = {re.sub(r'^W/', '', tag.strip()).strip('"') for tag in if_none_match.split(',')}
+        representations = {asset['etag']} | {f'{asset["etag"]}-{name}' for name in asset['variants']}
+        if '*' in tags or tags & representations:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', asset['cache_control'])
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return True
+        
+        path, size = asset['variants'][encoding]
+        self.send_response(200)
+        self.send_header('Content-Type', asset['content_type'])
+        self.send_header('Content-Length', str(size))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', asset['cache_control'])
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        
+        if not head_only:
+            #Zero-copy from the page cache where the OS supports sendfile
+            with open(path, 'rb') as f:
+                self.wfile.flush()
+                self.connection.sendfile(f)
+        return True
+
+class YuktiHTTPServer(http.server.ThreadingHTTPServer):
+    """Thread-per-connection server"""
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+def server_class_for(bind, port):
+    """YuktiHTTPServer with the address family of the bind address (IPv4 or IPv6)"""
+    if not bind:
+        return YuktiHTTPServer, ('', port)
+    
+    infos = socket.getaddrinfo(bind, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)
+    family, _, _, _, address = infos[0]
+    
+    class Server(YuktiHTTPServer):
+        address_family = family
+    
+    return Server, address[:2]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="YuktiAI web interface server")
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--bind', default='', help='Address to bind (default: all interfaces)')
+    parser.add_argument('--directory', default='web', help='Directory with index.html (default: web)')
+    parser.add_argument('--no-browser', action='store_true', help='Do not open a browser window')
+    return parser.parse_args(argv)
 
-def main():
+def main(argv=None):
     """Start the HTTP server"""
+    args = parse_args(argv)
     
     #Check if web directory exists
-    web_dir = Path("web")
+    web_dir = Path(args.directory)
     if not web_dir.exists():
         print("❌ Web directory not found!")
-        print("Please ensure the 'web' directory exists with index.html")
+        print(f"Please ensure the '{args.directory}' directory exists with index.html")
         sys.exit(1)
     
     #Check if index.html exists
@@ -38,34 +226,46 @@ def main():
         print("❌ index.html not found in web directory!")
         sys.exit(1)
     
-    PORT = 8000
+    PORT = args.port
+    #Wildcard binds are not browsable addresses (0.0.0.0 fails on Windows)
+    host = 'localhost' if args.bind in ('', '0.0.0.0', '::') else args.bind
+    if ':' in host:
+        host = f'[{host}]'
+    
+    assets = YuktiStaticAssets(web_dir)
+    handler = functools.partial(YuktiHTTPRequestHandler, directory=str(web_dir), assets=assets)
     
     try:
-        with socketserver.TCPServer(("", PORT), YuktiHTTPRequestHandler) as httpd:
+        server_class, address = server_class_for(args.bind, PORT)
+        with server_class(address, handler) as httpd:
             print("🌐 YuktiAI Web Interface")
             print("=" * 50)
-            print(f"✅ Server started at: http://localhost:{PORT}")
+            print(f"✅ Server started at: http://{host}:{PORT}")
             print(f"📁 Serving files from: {web_dir.absolute()}")
-            print("\n🚀 Opening YuktiAI in your browser...")
+            print(f"🗜️  Precompressed {len(assets.assets)} files (gzip{', brotli' if brotli else ''})")
             print("💡 Make sure Ollama is running: ollama serve")
             print("\n⏹️  Press Ctrl+C to stop the server")
             
             #Open browser
-            webbrowser.open(f'http://localhost:{PORT}')
+            if not args.no_browser:
+                print("\n🚀 Opening YuktiAI in your browser...")
+                webbrowser.open(f'http://{host}:{PORT}')
             
             #Start server
             httpd.serve_forever()
-            
+    
     except KeyboardInterrupt:
         print("\n\n🛑 Server stopped by user")
     except OSError as e:
-        if e.errno == 98:  #Port already in use
+        if e.errno in (48, 98, 10048):  #Port already in use
             print(f"❌ Port {PORT} is already in use!")
-            print("Please stop any other servers or use a different port")
+            print("Please stop any other servers or use a different port with --port")
         else:
             print(f"❌ Server error: {e}")
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
+    finally:
+        assets.cleanup()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()